@@ -0,0 +1,91 @@
+import os
+import tkinter as tk
+
+#################
+# -- GLOBALS -- #
+#################
+
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'images')
+
+
+###############
+# --CLASSES-- #
+###############
+
+
+class Assets:
+    """
+    Lazily loaded game images.
+    Sprites are found relative to this module, decoded on first use and cached per scale,
+    so startup only pays for the images the first frame shows.
+    """
+
+    def __init__(self, master=None, scale=1.0, directory=IMAGE_DIR):
+        """
+        Init method of Assets class
+        :param master: widget owning the images, the default Tk root if None [optional]
+        :param scale: scale used by item access, 1.0 for the original 30px sprites [optional]
+        :param directory: directory holding the png files [optional]
+        """
+        self.master = master
+        self.scale = scale
+        self.directory = directory
+        self._cache = {}
+
+    def names(self) -> list:
+        return sorted(file[:-4] for file in os.listdir(self.directory) if file.endswith('.png'))
+
+    def get(self, name, scale=None) -> tk.PhotoImage:
+        """
+        Returns an image, decoding it the first time it is asked for at this scale
+        :param name: file name without extension, e.g. 'tile_normal' or '3'
+        :param scale: scale factor, self.scale if None [optional]
+        :return: tk.PhotoImage
+        """
+        scale = self.scale if scale is None else scale
+        key = (name, scale)
+        image = self._cache.get(key)
+        if image is None:
+            image = self._cache[key] = self._load(name, scale)
+        return image
+
+    def _load(self, name, scale) -> tk.PhotoImage:
+        path = os.path.join(self.directory, f"{name}.png")
+        if not os.path.exists(path):
+            raise KeyError(name)
+        if scale == 1:
+            # Tk decodes png itself, which is faster than going through PIL
+            return tk.PhotoImage(master=self.master, file=path)
+
+        from PIL import Image, ImageTk
+        with Image.open(path) as image:
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            return ImageTk.PhotoImage(image.resize(size, Image.NEAREST), master=self.master)
+
+    def preload(self, names=None, scale=None) -> None:
+        """
+        Decodes images ahead of their first use
+        :param names: image names, all if None [optional]
+        :param scale: scale factor, self.scale if None [optional]
+        :return: None
+        """
+        for name in self.names() if names is None else names:
+            self.get(name, scale)
+
+    def clear(self, scale=None) -> None:
+        """
+        Drops cached images of one scale, or of every scale
+        :param scale: scale factor to drop, all if None [optional]
+        :return: None
+        """
+        if scale is None:
+            self._cache.clear()
+            return
+        for key in [key for key in self._cache if key[1] == scale]:
+            del self._cache[key]
+
+    def __getitem__(self, name) -> tk.PhotoImage:
+        return self.get(name)
+
+    def __contains__(self, name):
+        return os.path.exists(os.path.join(self.directory, f"{name}.png"))
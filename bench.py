@@ -0,0 +1,296 @@
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from engine import GameEngine, board_openings
+from minefield import Difficulty, difficulty_dict, generate_minefield
+from noguess import generate_no_guess
+
+#################
+# -- GLOBALS -- #
+#################
+
+SIZES = dict(difficulty_dict, **{
+    'large': Difficulty(650, 64, 64),
+    'huge': Difficulty(10000, 256, 256),
+    'giant': Difficulty(160000, 1000, 1000),
+})
+
+# One tk.Label per tile gets too slow to construct past this many tiles
+MAX_LABEL_CELLS = 128 * 128
+
+# Boards that need no guess get too rare to search for past the expert size
+MAX_NO_GUESS_CELLS = 30 * 16
+
+
+########################
+# --STATIC FUNCTIONS-- #
+########################
+
+
+def measure(setup, run, repeat) -> dict:
+    """
+    Times a function, excluding its setup; like timeit, garbage collection is paused while timing
+    :param setup: callable taking the repetition index and returning the argument of run
+    :param run: callable to time
+    :param repeat: number of timed runs
+    :return: dict: min, median and mean in seconds
+    """
+    times = []
+    for i in range(repeat):
+        state = setup(i)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(state)
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return {
+        'repeat': repeat,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.fmean(times),
+    }
+
+
+def _safe_start(level) -> tuple:
+    return level.cols // 2, level.rows // 2
+
+
+def _game(level, seed) -> GameEngine:
+    # Boards come with their opening index, as dealt by the prefetcher
+    minefield = generate_minefield(level.mines, level.cols, level.rows, seed=seed, safe=_safe_start(level))
+    return GameEngine(minefield, openings=board_openings(minefield))
+
+
+def bench_generate(level, repeat) -> dict:
+    return measure(
+        lambda i: i,
+        lambda seed: generate_minefield(level.mines, level.cols, level.rows, seed=seed, safe=_safe_start(level)),
+        repeat,
+    )
+
+
+def bench_openings(level, repeat) -> dict:
+    """
+    Times building the opening index of a board, done by the prefetcher next to every board it deals
+    """
+    return measure(
+        lambda i: generate_minefield(level.mines, level.cols, level.rows, seed=i, safe=_safe_start(level)),
+        board_openings,
+        repeat,
+    )
+
+
+def bench_generate_no_guess(level, repeat) -> dict:
+    """
+    Times the search for a board that needs no guess, in this process
+    """
+    if level.cols * level.rows > MAX_NO_GUESS_CELLS:
+        return {'skipped': f"more than {MAX_NO_GUESS_CELLS} tiles"}
+    return measure(
+        lambda i: i * 1000,
+        lambda seed: generate_no_guess(level.mines, level.cols, level.rows, seed=seed, start=_safe_start(level)),
+        repeat,
+    )
+
+
+def bench_flood(level, repeat) -> dict:
+    """
+    Times the first click of a game, which floods the opening around it
+    """
+    return measure(lambda i: _game(level, i), lambda engine: engine.reveal(*_safe_start(level)), repeat)
+
+
+def _blank_game(level) -> GameEngine:
+    minefield = generate_minefield(0, level.cols, level.rows)
+    return GameEngine(minefield, openings=board_openings(minefield))
+
+
+def bench_flood_full(level, repeat) -> dict:
+    """
+    Times a flood over a board without mines, the worst case of a single click
+    """
+    return measure(
+        lambda i: _blank_game(level),
+        lambda engine: engine.reveal(0, 0),
+        repeat,
+    )
+
+
+def _chord_setup(level, seed) -> tuple:
+    """
+    Builds a game with every mine flagged and every number revealed, leaving the blanks hidden
+    :return: (engine, (x, y) of the numbers)
+    """
+    engine = _game(level, seed)
+    tracker = engine.tracker
+    numbers = []
+    for y in range(engine.rows):
+        for x in range(engine.cols):
+            value = engine.value(x, y)
+            if value == 'X':
+                tracker.set_flag(x, y, True)
+            elif value != '0':
+                tracker.reveal(x, y)
+                numbers.append((x, y))
+    return engine, numbers
+
+
+def _chord_all(state) -> None:
+    engine, numbers = state
+    for x, y in numbers:
+        engine.chord(x, y)
+
+
+def bench_chord(level, repeat) -> dict:
+    """
+    Times chording every number of a fully flagged board
+    """
+    return measure(lambda i: _chord_setup(level, i), _chord_all, repeat)
+
+
+def bench_reveal_all(level, repeat) -> dict:
+    return measure(lambda i: _game(level, i), lambda engine: engine.reveal_all(), repeat)
+
+
+def _render_bench(renderer):
+    """
+    Builds a benchmark timing board construction with a renderer.
+    Needs a display; on a headless machine run under a virtual one, e.g. `xvfb-run python bench.py`
+    :param renderer: main.RENDERERS entry
+    :return: benchmark function
+    """
+    games = {}
+
+    def bench(level, repeat):
+        if renderer == 'label' and level.cols * level.rows > MAX_LABEL_CELLS:
+            return {'skipped': f"more than {MAX_LABEL_CELLS} tiles"}
+
+        try:
+            import tkinter as tk
+        except ImportError as e:
+            return {'skipped': str(e)}
+
+        from main import GameState, PySweeper
+        if renderer not in games:
+            try:
+                root = tk.Tk()
+            except tk.TclError as e:
+                return {'skipped': f"no display: {e}"}
+            game = PySweeper(root, renderer=renderer)
+            game.images.preload()
+            games[renderer] = game
+        game = games[renderer]
+
+        def setup(i):
+            game.board.frame.destroy()
+            del game.board
+            game.mines, game.cols, game.rows = level
+            game.engine = _game(level, i)
+            # Boards of real games are built from start_game, where every tile gets its event bindings
+            game.game_state = GameState.PLAYING
+
+        def run(_):
+            game._add_board()
+            game.root.update_idletasks()
+
+        return measure(setup, run, repeat)
+
+    return bench
+
+
+CASES = {
+    'generate': bench_generate,
+    'generate_no_guess': bench_generate_no_guess,
+    'openings': bench_openings,
+    'flood': bench_flood,
+    'flood_full': bench_flood_full,
+    'chord': bench_chord,
+    'reveal_all': bench_reveal_all,
+    'render_label': _render_bench('label'),
+    'render_canvas': _render_bench('canvas'),
+    'render_viewport': _render_bench('viewport'),
+}
+
+
+def run(cases, sizes, repeat=10) -> dict:
+    """
+    Runs every case on every size
+    :param cases: keys of CASES
+    :param sizes: keys of SIZES
+    :param repeat: timed runs per benchmark [optional]
+    :return: dict: 'meta' describing the machine, 'results' keyed by 'case/size'
+    """
+    results = {}
+    for case in cases:
+        for size in sizes:
+            results[f"{case}/{size}"] = CASES[case](SIZES[size], repeat)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'system': platform.system(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=0.1) -> dict:
+    """
+    Compares two runs by their fastest timings, which vary the least between runs
+    :param current: output of run()
+    :param baseline: output of an earlier run()
+    :param threshold: relative slowdown reported as a regression, 0.1 for 10% [optional]
+    :return: dict: 'case/size' -> ratio, baseline and current timings, and a 'regression' flag
+    """
+    comparison = {}
+    for key, result in current['results'].items():
+        before = baseline['results'].get(key, {})
+        if 'min' not in result or 'min' not in before:
+            continue
+        ratio = result['min'] / before['min'] if before['min'] else float('inf')
+        comparison[key] = {
+            'baseline': before['min'],
+            'current': result['min'],
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold,
+        }
+    return comparison
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time the PySweeper hot paths and compare against a baseline")
+    parser.add_argument('--cases', nargs='+', choices=tuple(CASES), default=list(CASES))
+    parser.add_argument('--sizes', nargs='+', choices=tuple(SIZES), default=[size for size in SIZES if size != 'giant'],
+                        help="board sizes, all but 'giant' by default")
+    parser.add_argument('--repeat', type=int, default=10, help="timed runs per benchmark")
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--baseline', help="compare against results written earlier with --output")
+    parser.add_argument('--threshold', type=float, default=0.1, help="slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.cases, args.sizes, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if not args.baseline:
+        sys.stdout.write(json.dumps(results, indent=2) + "\n")
+        return 0
+
+    with open(args.baseline) as file:
+        comparison = compare(results, json.load(file), args.threshold)
+    sys.stdout.write(json.dumps(comparison, indent=2) + "\n")
+    return 1 if any(entry['regression'] for entry in comparison.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
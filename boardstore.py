@@ -0,0 +1,330 @@
+import argparse
+import random
+import sqlite3
+import sys
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+import numpy as np
+from gamefile import GameRecord
+from metrics import batch_metrics
+from minefield import MINE, Difficulty, difficulty_dict, generate_minefield_array
+
+#################
+# -- GLOBALS -- #
+#################
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS boards (
+    id INTEGER PRIMARY KEY,
+    cols INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    mines INTEGER NOT NULL,
+    seed INTEGER NOT NULL,
+    mine_bits BLOB NOT NULL,
+    three_bv INTEGER,
+    openings INTEGER,
+    isolated INTEGER,
+    ordinal INTEGER NOT NULL,
+    bv_ordinal INTEGER
+);
+CREATE UNIQUE INDEX IF NOT EXISTS boards_key ON boards (cols, rows, mines, seed);
+CREATE UNIQUE INDEX IF NOT EXISTS boards_ordinal ON boards (cols, rows, mines, ordinal);
+CREATE UNIQUE INDEX IF NOT EXISTS boards_bucket ON boards (cols, rows, mines, three_bv, bv_ordinal);
+"""
+
+INSERT = """
+INSERT INTO boards (cols, rows, mines, seed, mine_bits, three_bv, openings, isolated, ordinal, bv_ordinal)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SIZE = "cols = ? AND rows = ? AND mines = ?"
+
+# Seeds looked up per query when skipping stored boards, below SQLite's limit of bound parameters
+SEED_QUERY = 900
+
+
+########################
+# --STATIC FUNCTIONS-- #
+########################
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Fill a PySweeper board store with generated boards")
+    parser.add_argument('path', help="database file")
+    parser.add_argument('--count', type=int, default=10000, help="boards per difficulty")
+    parser.add_argument('--difficulty', nargs='+', choices=tuple(difficulty_dict), default=['beginner'])
+    parser.add_argument('--custom', nargs=3, type=int, metavar=('MINES', 'COLS', 'ROWS'),
+                        help="store a custom size instead of the named difficulties")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first board")
+    parser.add_argument('--no-metrics', action='store_true', help="skip computing 3BV and openings")
+    args = parser.parse_args(argv)
+
+    if args.custom:
+        levels = {'custom': Difficulty(*args.custom)}
+    else:
+        levels = {name: difficulty_dict[name] for name in args.difficulty}
+
+    with BoardStore(args.path) as store:
+        for name, level in levels.items():
+            start = time.perf_counter()
+            added = store.bulk_insert(level, range(args.seed, args.seed + args.count), not args.no_metrics)
+            sys.stdout.write(f"{name}: added {added} boards in {time.perf_counter() - start:.1f}s, "
+                             f"{store.count(level)} stored\n")
+
+
+###############
+# --CLASSES-- #
+###############
+
+
+class BoardStore:
+    """
+    SQLite corpus of generated boards keyed by (cols, rows, mines, seed).
+    Mine layouts are stored bit-packed as in gamefile, with their 3BV, openings and isolated numbers.
+    Boards are numbered densely per size (ordinal) and per size and 3BV (bv_ordinal),
+    so a uniform random draw is an index seek on a random number instead of a table scan.
+    Boards read recently are kept in an in-memory LRU cache.
+    """
+
+    def __init__(self, path=':memory:', cache_size=256):
+        """
+        Init method of BoardStore class
+        :param path: path of the database file [optional]
+        :param cache_size: number of boards kept in memory [optional]
+        """
+        if cache_size < 0:
+            raise ValueError("cache_size must not be negative")
+
+        self.path = path
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM boards").fetchone()[0]
+
+    def _next(self, query, params) -> int:
+        last = self.db.execute(query, params).fetchone()[0]
+        return 0 if last is None else last + 1
+
+    def _insert(self, level, seeds, fields, metrics) -> int:
+        """
+        Stores a batch of generated boards, skipping the ones already stored, in one transaction
+        :param level: minefield.Difficulty
+        :param seeds: seed of every board
+        :param fields: (boards, rows, cols) int8 array from generate_minefield_array
+        :param metrics: compute 3BV, openings and isolated numbers
+        :return: int: number of boards added
+        """
+        size = [level.cols, level.rows, level.mines]
+        bits = np.packbits((fields == MINE).reshape(len(seeds), -1), axis=1, bitorder='little')
+        if metrics:
+            scores = batch_metrics(fields)
+            columns = list(zip(scores.three_bv.tolist(), scores.openings.tolist(), scores.isolated.tolist()))
+        else:
+            columns = [(None, None, None)] * len(seeds)
+
+        with self.db:
+            stored = set()
+            for i in range(0, len(seeds), SEED_QUERY):
+                chunk = seeds[i:i + SEED_QUERY]
+                stored.update(row[0] for row in self.db.execute(
+                    f"SELECT seed FROM boards WHERE {SIZE} AND seed IN ({', '.join('?' * len(chunk))})", size + chunk
+                ))
+
+            # Ordinals continue from the largest stored one, keeping them dense
+            ordinal = self._next(f"SELECT MAX(ordinal) FROM boards WHERE {SIZE}", size)
+            bv_ordinals = {}
+            rows = []
+            for i, (seed, values) in enumerate(zip(seeds, columns)):
+                if seed in stored:
+                    continue
+                stored.add(seed)
+                three_bv = values[0]
+                bv_ordinal = None
+                if three_bv is not None:
+                    if three_bv not in bv_ordinals:
+                        bv_ordinals[three_bv] = self._next(
+                            f"SELECT MAX(bv_ordinal) FROM boards WHERE {SIZE} AND three_bv = ?", size + [three_bv]
+                        )
+                    bv_ordinal = bv_ordinals[three_bv]
+                    bv_ordinals[three_bv] += 1
+                rows.append((*size, seed, bits[i].tobytes(), *values, ordinal, bv_ordinal))
+                ordinal += 1
+            self.db.executemany(INSERT, rows)
+        return len(rows)
+
+    def add(self, level, seed, metrics=True) -> bool:
+        """
+        Generates a board and stores it
+        :param level: minefield.Difficulty
+        :param seed: seed of the board
+        :param metrics: also compute and store its difficulty metrics [optional]
+        :return: bool: False if the board was already stored
+        """
+        field = generate_minefield_array(level.mines, level.cols, level.rows, seed)
+        return self._insert(level, [seed], field[np.newaxis], metrics) == 1
+
+    def bulk_insert(self, level, seeds, metrics=True, batch=1024) -> int:
+        """
+        Generates and stores many boards, scoring and inserting them in batches
+        :param level: minefield.Difficulty
+        :param seeds: iterable of seeds
+        :param metrics: also compute and store difficulty metrics [optional]
+        :param batch: boards per transaction [optional]
+        :return: int: number of boards added
+        """
+        added = 0
+        seeds = iter(seeds)
+        while True:
+            chunk = [seed for _, seed in zip(range(batch), seeds)]
+            if not chunk:
+                return added
+            fields = np.stack([generate_minefield_array(level.mines, level.cols, level.rows, seed) for seed in chunk])
+            added += self._insert(level, chunk, fields, metrics)
+
+    @staticmethod
+    def _record(level, row) -> GameRecord:
+        seed, mine_bits = row
+        return GameRecord(level.cols, level.rows, level.mines, mine_bits, seed)
+
+    def get(self, level, seed):
+        """
+        Reads a stored board
+        :param level: minefield.Difficulty
+        :param seed: seed of the board
+        :return: gamefile.GameRecord or None if the board is not stored
+        """
+        key = (level.cols, level.rows, level.mines, seed)
+        record = self._cache.get(key)
+        if record is not None:
+            self._cache.move_to_end(key)
+            return record
+
+        row = self.db.execute(
+            "SELECT seed, mine_bits FROM boards WHERE cols = ? AND rows = ? AND mines = ? AND seed = ?", key
+        ).fetchone()
+        if row is None:
+            return None
+        record = self._record(level, row)
+        if self.cache_size:
+            self._cache[key] = record
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return record
+
+    def minefield(self, level, seed) -> list:
+        """
+        Returns a board as a 2D list of string values, generating and storing it if it is not stored yet
+        :param level: minefield.Difficulty
+        :param seed: seed of the board
+        :return: list
+        """
+        record = self.get(level, seed)
+        if record is None:
+            self.add(level, seed)
+            record = self.get(level, seed)
+        return record.minefield()
+
+    def metrics(self, level, seed):
+        """
+        Reads the stored difficulty metrics of a board
+        :param level: minefield.Difficulty
+        :param seed: seed of the board
+        :return: (three_bv, openings, isolated) or None if the board is not stored
+        """
+        return self.db.execute(
+            "SELECT three_bv, openings, isolated FROM boards WHERE cols = ? AND rows = ? AND mines = ? AND seed = ?",
+            (level.cols, level.rows, level.mines, seed),
+        ).fetchone()
+
+    def _bucket(self, level, low, high) -> tuple:
+        clause = SIZE
+        params = [level.cols, level.rows, level.mines]
+        if low is not None:
+            clause += " AND three_bv >= ?"
+            params.append(low)
+        if high is not None:
+            clause += " AND three_bv <= ?"
+            params.append(high)
+        return clause, params
+
+    def count(self, level, low=None, high=None) -> int:
+        """
+        Counts the stored boards of a size, optionally within a 3BV bucket
+        :param level: minefield.Difficulty
+        :param low: smallest 3BV [optional]
+        :param high: largest 3BV [optional]
+        :return: int
+        """
+        clause, params = self._bucket(level, low, high)
+        return self.db.execute(f"SELECT COUNT(*) FROM boards WHERE {clause}", params).fetchone()[0]
+
+    def _bv_counts(self, level, low, high) -> list:
+        """
+        Counts the stored boards of every 3BV value of a bucket, with one index seek per value
+        :param level: minefield.Difficulty
+        :param low: smallest 3BV, or None
+        :param high: largest 3BV, or None
+        :return: list of (three_bv, number of boards) in increasing 3BV
+        """
+        size = [level.cols, level.rows, level.mines]
+        counts = []
+        value = self.db.execute(
+            f"SELECT MIN(three_bv) FROM boards WHERE {SIZE} AND three_bv >= ?", size + [low or 0]
+        ).fetchone()[0]
+        while value is not None and (high is None or value <= high):
+            counts.append((value, self._next(
+                f"SELECT MAX(bv_ordinal) FROM boards WHERE {SIZE} AND three_bv = ?", size + [value]
+            )))
+            value = self.db.execute(
+                f"SELECT MIN(three_bv) FROM boards WHERE {SIZE} AND three_bv > ?", size + [value]
+            ).fetchone()[0]
+        return counts
+
+    def sample(self, level, count=1, low=None, high=None, rand=None) -> list:
+        """
+        Draws uniformly random boards of a size, optionally within a 3BV bucket.
+        A draw picks a random rank and seeks to the board numbered with it: its ordinal for a whole size,
+        or a 3BV value, weighted by its number of boards, and its bv_ordinal for a bucket.
+        :param level: minefield.Difficulty
+        :param count: number of boards; fewer are returned if the bucket is smaller [optional]
+        :param low: smallest 3BV [optional]
+        :param high: largest 3BV [optional]
+        :param rand: random.Random used for the draws [optional]
+        :return: list of gamefile.GameRecord, without duplicates
+        """
+        rand = rand or random
+        size = [level.cols, level.rows, level.mines]
+        if low is None and high is None:
+            total = self._next(f"SELECT MAX(ordinal) FROM boards WHERE {SIZE}", size)
+            query = f"SELECT seed, mine_bits FROM boards WHERE {SIZE} AND ordinal = ?"
+            keys = [[rank] for rank in rand.sample(range(total), min(count, total))]
+        else:
+            counts = self._bv_counts(level, low, high)
+            ends = list(accumulate(number for _, number in counts))
+            total = ends[-1] if ends else 0
+            query = f"SELECT seed, mine_bits FROM boards WHERE {SIZE} AND three_bv = ? AND bv_ordinal = ?"
+            keys = []
+            for rank in rand.sample(range(total), min(count, total)):
+                i = bisect_right(ends, rank)
+                keys.append([counts[i][0], rank - (ends[i - 1] if i else 0)])
+        return [self._record(level, self.db.execute(query, size + key).fetchone()) for key in keys]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+from collections import OrderedDict
+import numpy as np
+from engine import GameEngine, EngineState, RegionCounts
+from minefield import MINE, count_adjacent, place_mines
+from storage import BitArray
+
+#################
+# -- GLOBALS -- #
+#################
+
+DIGITS = tuple(str(n) for n in range(9))
+
+
+###############
+# --CLASSES-- #
+###############
+
+
+class ChunkedField:
+    """
+    Endless minefield split into square chunks.
+    Each chunk is generated deterministically from (seed, chunk_x, chunk_y) the first time it is reached,
+    with neighbor numbers counted across chunk borders.
+    Generated chunks live in an LRU cache of at most max_chunks entries and are regenerated from the seed
+    after eviction; only the revealed/flagged bits of explored chunks are kept for the whole game.
+    Implements the StateTracker interface so EndlessEngine can run the game rules on it.
+    """
+
+    def __init__(self, seed, chunk_size=32, density=0.16, max_chunks=256):
+        """
+        Init method of ChunkedField class
+        :param seed: seed of the whole field
+        :param chunk_size: width and height of a chunk in tiles [optional]
+        :param density: fraction of tiles holding a mine [optional]
+        :param max_chunks: number of generated chunks kept in memory [optional]
+        """
+        if chunk_size < 3:
+            raise ValueError("chunk_size must be at least 3")
+        if max_chunks < 1:
+            raise ValueError("max_chunks must be at least 1")
+
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.chunk_mines = round(density * chunk_size * chunk_size)
+        self.max_chunks = max_chunks
+
+        # The field is unbounded; these mirror the StateTracker interface
+        self.rows = None
+        self.cols = None
+        self.mines = None
+
+        # First click at the centre of chunk (0, 0) is always an opening
+        self.start = (chunk_size // 2, chunk_size // 2)
+
+        self._layouts = OrderedDict()
+        self._chunks = OrderedDict()
+        self.revealed = {}
+        self.flagged = {}
+        self.revealed_count = 0
+        self.revealed_safe = 0
+        self.flagged_count = 0
+
+    @property
+    def loaded_chunks(self) -> int:
+        return len(self._chunks)
+
+    @property
+    def explored_chunks(self) -> int:
+        return len(self.revealed)
+
+    @property
+    def remaining_safe(self):
+        return None
+
+    @property
+    def mines_left(self):
+        return None
+
+    def _cache(self, cache, key, build):
+        """
+        Fetches a value from an LRU cache, building it and evicting the oldest entries when missing
+        :param cache: OrderedDict acting as the cache
+        :param key: (chunk_x, chunk_y)
+        :param build: callable taking (chunk_x, chunk_y)
+        :return: cached value
+        """
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        value = cache[key] = build(*key)
+        while len(cache) > self.max_chunks:
+            cache.popitem(last=False)
+        return value
+
+    def _build_layout(self, chunk_x, chunk_y) -> np.ndarray:
+        """
+        Places the mines of a single chunk
+        :param chunk_x: chunk column
+        :param chunk_y: chunk row
+        :return: np.ndarray: 2D boolean mine mask of the chunk
+        """
+        size = self.chunk_size
+        safe = self.start if (chunk_x, chunk_y) == (0, 0) else None
+        mask = np.zeros(size * size, dtype=bool)
+        mask[place_mines(self.chunk_mines, size, size, f"{self.seed}:{chunk_x}:{chunk_y}", safe)] = True
+        return mask.reshape(size, size)
+
+    def _build_chunk(self, chunk_x, chunk_y) -> np.ndarray:
+        """
+        Generates a chunk and counts its numbers using the mine layouts of the 8 surrounding chunks
+        :param chunk_x: chunk column
+        :param chunk_y: chunk row
+        :return: np.ndarray: 2D int8 array, MINE or 0-8
+        """
+        size = self.chunk_size
+        window = np.zeros((size * 3, size * 3), dtype=bool)
+        for i in range(3):
+            for j in range(3):
+                layout = self._layout(chunk_x + j - 1, chunk_y + i - 1)
+                window[i * size:(i + 1) * size, j * size:(j + 1) * size] = layout
+
+        # Only a 1 tile border of the neighbours is needed for the centre chunk
+        inner = window[size - 1:2 * size + 1, size - 1:2 * size + 1]
+        field = count_adjacent(inner)[1:-1, 1:-1]
+        field[inner[1:-1, 1:-1]] = MINE
+        return field
+
+    def _layout(self, chunk_x, chunk_y) -> np.ndarray:
+        return self._cache(self._layouts, (chunk_x, chunk_y), self._build_layout)
+
+    def chunk(self, chunk_x, chunk_y) -> np.ndarray:
+        """
+        Returns a generated chunk, creating it on first use
+        :param chunk_x: chunk column
+        :param chunk_y: chunk row
+        :return: np.ndarray: 2D int8 array, MINE or 0-8
+        """
+        return self._cache(self._chunks, (chunk_x, chunk_y), self._build_chunk)
+
+    def _locate(self, x, y) -> tuple:
+        size = self.chunk_size
+        return (x // size, y // size), (y % size) * size + x % size
+
+    def value(self, x, y) -> str:
+        size = self.chunk_size
+        cell = self.chunk(x // size, y // size)[y % size, x % size]
+        return 'X' if cell == MINE else DIGITS[cell]
+
+    def is_mine(self, x, y) -> bool:
+        size = self.chunk_size
+        return bool(self._layout(x // size, y // size)[y % size, x % size])
+
+    def is_revealed(self, x, y) -> bool:
+        key, index = self._locate(x, y)
+        bits = self.revealed.get(key)
+        return bits is not None and bits[index]
+
+    def is_flagged(self, x, y) -> bool:
+        key, index = self._locate(x, y)
+        bits = self.flagged.get(key)
+        return bits is not None and bits[index]
+
+    def _bits(self, states, key) -> BitArray:
+        bits = states.get(key)
+        if bits is None:
+            bits = states[key] = BitArray(self.chunk_size * self.chunk_size)
+        return bits
+
+    def reveal(self, x, y) -> bool:
+        """
+        Marks a tile as revealed, clearing any flag on it
+        :param x: index of column
+        :param y: index of row
+        :return: bool: True if the tile was hidden before
+        """
+        if self.is_revealed(x, y):
+            return False
+        if self.is_flagged(x, y):
+            self.set_flag(x, y, False)
+
+        key, index = self._locate(x, y)
+        self._bits(self.revealed, key)[index] = True
+        self.revealed_count += 1
+        if not self.is_mine(x, y):
+            self.revealed_safe += 1
+        return True
+
+    def set_flag(self, x, y, flagged) -> bool:
+        """
+        Sets the flag on a hidden tile
+        :param x: index of column
+        :param y: index of row
+        :param flagged: new flag state
+        :return: bool: True if the flag state changed
+        """
+        if self.is_revealed(x, y) or self.is_flagged(x, y) == flagged:
+            return False
+
+        key, index = self._locate(x, y)
+        self._bits(self.flagged, key)[index] = flagged
+        self.flagged_count += 1 if flagged else -1
+        return True
+
+    def region_counts(self, x0, y0, x1, y1) -> RegionCounts:
+        """
+        Counts revealed, flagged and hidden tiles in the rectangle [x0, x1) x [y0, y1)
+        :param x0: first column
+        :param y0: first row
+        :param x1: column past the last one
+        :param y1: row past the last one
+        :return: RegionCounts
+        """
+        if x0 >= x1 or y0 >= y1:
+            return RegionCounts(0, 0, 0, 0)
+
+        size = self.chunk_size
+        revealed = flagged = 0
+        for y in range(y0, y1):
+            local_y = y % size
+            for chunk_x in range(x0 // size, (x1 - 1) // size + 1):
+                key = (chunk_x, y // size)
+                start = local_y * size + max(x0 - chunk_x * size, 0)
+                stop = local_y * size + min(x1 - chunk_x * size, size)
+                if key in self.revealed:
+                    revealed += self.revealed[key].count(start, stop)
+                if key in self.flagged:
+                    flagged += self.flagged[key].count(start, stop)
+
+        cells = (x1 - x0) * (y1 - y0)
+        return RegionCounts(cells, revealed, flagged, cells - revealed)
+
+    def mine_cells(self) -> list:
+        """
+        Returns the coordinates of every mine in the explored chunks
+        :return: list: (x, y) tuples
+        """
+        size = self.chunk_size
+        cells = []
+        for chunk_x, chunk_y in self.revealed:
+            for local_y, local_x in zip(*np.nonzero(self._layout(chunk_x, chunk_y))):
+                cells.append((chunk_x * size + int(local_x), chunk_y * size + int(local_y)))
+        return cells
+
+
+class EndlessEngine(GameEngine):
+    """
+    GameEngine variant for a ChunkedField: the board has no edges and the game only ends on a mine
+    """
+
+    def __init__(self, field, flood_limit=100000):
+        """
+        Init method of EndlessEngine class
+        :param field: ChunkedField holding the board
+        :param flood_limit: maximum tiles opened by a single flood, so sparse fields cannot run away [optional]
+        """
+        super().__init__(storage=field)
+        self.field = field
+        self.flood_limit = flood_limit
+
+    @property
+    def score(self) -> int:
+        return self.tracker.revealed_safe
+
+    def adjacent(self, x, y) -> list:
+        """
+        Returns the coordinates of the 8 neighbors of a tile
+        :param x: index of column
+        :param y: index of row
+        :return: list: (x, y) tuples
+        """
+        return [(x + j, y + i) for i in range(-1, 2) for j in range(-1, 2) if i or j]
+
+    def flood_reveal(self, x, y) -> set:
+        """
+        Iteratively reveals a tile and, if it is blank, the connected blank region and its border,
+        stopping once flood_limit tiles have been opened
+        :param x: index of column
+        :param y: index of row
+        :return: set: (x, y) of every tile revealed
+        """
+        revealed = set()
+        visited = {(x, y)}
+        stack = [(x, y)]
+        while stack and len(revealed) < self.flood_limit:
+            cell_x, cell_y = stack.pop()
+            if self._reveal_cell(cell_x, cell_y):
+                revealed.add((cell_x, cell_y))
+
+            if self.value(cell_x, cell_y) != '0':
+                continue
+
+            for cell in self.adjacent(cell_x, cell_y):
+                if cell not in visited and not self.is_revealed(*cell):
+                    visited.add(cell)
+                    stack.append(cell)
+        return revealed
+
+    def reveal_all(self) -> set:
+        raise ValueError("an endless board has no end, it cannot be revealed in full; use reveal_mines to give up")
+
+    def _reveal_cell(self, x, y) -> bool:
+        """
+        Reveals a single tile; revealing a mine ends the game
+        :param x: index of column
+        :param y: index of row
+        :return: bool: True if the tile was revealed
+        """
+        if self.is_flagged(x, y) or not self.tracker.reveal(x, y):
+            return False
+
+        if self.is_mine(x, y):
+            self.state = EngineState.LOST
+        return True
@@ -0,0 +1,464 @@
+import time
+from enum import Enum
+from collections import namedtuple
+from metrics import opening_index
+from neighbors import neighbor_indices, neighbor_table
+
+#################
+# -- GLOBALS -- #
+#################
+
+RegionCounts = namedtuple("RegionCounts", "cells revealed flagged hidden")
+
+# A move accepted by the engine; time is in milliseconds since the engine was created
+Move = namedtuple("Move", "time action x y")
+
+ACTIONS = ('reveal', 'flag', 'chord')
+
+# Boards above this size flood instead of holding an opening index
+MAX_OPENING_CELLS = 1 << 18
+
+
+########################
+# --STATIC FUNCTIONS-- #
+########################
+
+
+def edge_case(dx, dy, width, height) -> bool:
+    return dx < 0 or dx > width - 1 or dy < 0 or dy > height - 1
+
+
+def board_openings(minefield):
+    """
+    Precomputes the openings of a board, so revealing a blank tile opens its region in one lookup
+    :param minefield: 2D list of string values from generate_minefield
+    :return: metrics.OpeningIndex or None for boards too large to hold one
+    """
+    if not minefield or len(minefield) * len(minefield[0]) > MAX_OPENING_CELLS:
+        return None
+    return opening_index(minefield)
+
+
+###############
+# --CLASSES-- #
+###############
+
+
+class EngineState(Enum):
+    """
+    Enum holding the outcome of a game
+    """
+    PLAYING = 0
+    WON = 1
+    LOST = 2
+
+
+class StateTracker:
+    """
+    Authoritative record of revealed and flagged tiles.
+    Every transition is idempotent and keeps the counters exact, so win checks are O(1).
+    Per-block counters let region queries skip whole blocks instead of rescanning every tile.
+    """
+    BLOCK = 16
+
+    def __init__(self, minefield):
+        """
+        Init method of StateTracker class
+        :param minefield: 2D list of string values from generate_minefield
+        """
+        self.minefield = minefield
+        self.rows = len(minefield)
+        self.cols = len(minefield[0]) if minefield else 0
+        self.mines = sum(row.count('X') for row in minefield)
+        self.safe = self.rows * self.cols - self.mines
+
+        self.revealed = [[False] * self.cols for _ in range(self.rows)]
+        self.flagged = [[False] * self.cols for _ in range(self.rows)]
+        self.revealed_count = 0
+        self.revealed_safe = 0
+        self.flagged_count = 0
+
+        block_rows = -(-self.rows // self.BLOCK)
+        block_cols = -(-self.cols // self.BLOCK)
+        self._block_revealed = [[0] * block_cols for _ in range(block_rows)]
+        self._block_flagged = [[0] * block_cols for _ in range(block_rows)]
+
+    @property
+    def remaining_safe(self) -> int:
+        return self.safe - self.revealed_safe
+
+    def value(self, x, y) -> str:
+        return self.minefield[y][x]
+
+    def is_mine(self, x, y) -> bool:
+        return self.minefield[y][x] == 'X'
+
+    def is_revealed(self, x, y) -> bool:
+        return self.revealed[y][x]
+
+    def is_flagged(self, x, y) -> bool:
+        return self.flagged[y][x]
+
+    def mine_cells(self) -> list:
+        """
+        Returns the coordinates of every mine
+        :return: list: (x, y) tuples
+        """
+        return [(x, y) for y, row in enumerate(self.minefield) for x, value in enumerate(row) if value == 'X']
+
+    @property
+    def mines_left(self) -> int:
+        return self.mines - self.flagged_count
+
+    def reveal(self, x, y) -> bool:
+        """
+        Marks a tile as revealed, clearing any flag on it
+        :param x: index of column
+        :param y: index of row
+        :return: bool: True if the tile was hidden before
+        """
+        if self.revealed[y][x]:
+            return False
+        if self.flagged[y][x]:
+            self.set_flag(x, y, False)
+
+        self.revealed[y][x] = True
+        self.revealed_count += 1
+        if self.minefield[y][x] != 'X':
+            self.revealed_safe += 1
+        self._block_revealed[y // self.BLOCK][x // self.BLOCK] += 1
+        return True
+
+    def set_flag(self, x, y, flagged) -> bool:
+        """
+        Sets the flag on a hidden tile
+        :param x: index of column
+        :param y: index of row
+        :param flagged: new flag state
+        :return: bool: True if the flag state changed
+        """
+        if self.revealed[y][x] or self.flagged[y][x] == flagged:
+            return False
+
+        self.flagged[y][x] = flagged
+        step = 1 if flagged else -1
+        self.flagged_count += step
+        self._block_flagged[y // self.BLOCK][x // self.BLOCK] += step
+        return True
+
+    def region_counts(self, x0, y0, x1, y1) -> RegionCounts:
+        """
+        Counts revealed, flagged and hidden tiles in the rectangle [x0, x1) x [y0, y1)
+        :param x0: first column
+        :param y0: first row
+        :param x1: column past the last one
+        :param y1: row past the last one
+        :return: RegionCounts
+        """
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.cols, x1), min(self.rows, y1)
+        if x0 >= x1 or y0 >= y1:
+            return RegionCounts(0, 0, 0, 0)
+
+        block = self.BLOCK
+        revealed = flagged = 0
+        for block_y in range(y0 // block, (y1 - 1) // block + 1):
+            top, bottom = max(y0, block_y * block), min(y1, (block_y + 1) * block)
+            for block_x in range(x0 // block, (x1 - 1) // block + 1):
+                left, right = max(x0, block_x * block), min(x1, (block_x + 1) * block)
+
+                if right - left == block and bottom - top == block:
+                    revealed += self._block_revealed[block_y][block_x]
+                    flagged += self._block_flagged[block_y][block_x]
+                    continue
+
+                for y in range(top, bottom):
+                    revealed += sum(self.revealed[y][left:right])
+                    flagged += sum(self.flagged[y][left:right])
+
+        cells = (x1 - x0) * (y1 - y0)
+        return RegionCounts(cells, revealed, flagged, cells - revealed)
+
+
+class GameEngine:
+    """
+    Headless game engine holding the rules of PySweeper, independent of tkinter
+    """
+
+    def __init__(self, minefield=None, storage=None, openings=None):
+        """
+        Init method of GameEngine class
+        :param minefield: 2D list of string values from generate_minefield
+        :param storage: board storage used instead of a StateTracker over minefield,
+        e.g. a storage.PackedBoard for huge boards [optional]
+        :param openings: board_openings(minefield), built on the first blank tile revealed if not given [optional]
+        """
+        self.minefield = minefield
+        self.openings = openings
+        self.tracker = storage if storage is not None else StateTracker(minefield)
+        self.rows = self.tracker.rows
+        self.cols = self.tracker.cols
+        self.mines = self.tracker.mines
+        self.state = EngineState.PLAYING
+        self.listeners = []
+        self.history = []
+        self._started = time.perf_counter()
+
+        self._neighbors = None
+        self._adjacent = None
+        if self.rows is not None:
+            self._neighbors = neighbor_table(self.rows, self.cols)
+            self._adjacent = self._neighbors.adjacent
+
+        # Bound accessors of the storage backend, looked up once for the hot loops
+        self.value = self.tracker.value
+        self.is_mine = self.tracker.is_mine
+        self.is_revealed = self.tracker.is_revealed
+        self.is_flagged = self.tracker.is_flagged
+
+    @property
+    def playing(self) -> bool:
+        return self.state == EngineState.PLAYING
+
+    @property
+    def won(self) -> bool:
+        return self.state == EngineState.WON
+
+    @property
+    def lost(self) -> bool:
+        return self.state == EngineState.LOST
+
+    @property
+    def revealed_count(self) -> int:
+        return self.tracker.revealed_count
+
+    @property
+    def flagged_count(self) -> int:
+        return self.tracker.flagged_count
+
+    @property
+    def remaining_safe(self) -> int:
+        return self.tracker.remaining_safe
+
+    @property
+    def mines_left(self) -> int:
+        return self.tracker.mines_left
+
+    def region_counts(self, x0, y0, x1, y1) -> RegionCounts:
+        return self.tracker.region_counts(x0, y0, x1, y1)
+
+    def add_listener(self, callback) -> None:
+        """
+        Registers a callable that receives the set of (x, y) changed by every move
+        :param callback: callable taking a set of (x, y)
+        :return: None
+        """
+        self.listeners.append(callback)
+
+    def _record(self, action, x, y) -> None:
+        elapsed = int((time.perf_counter() - self._started) * 1000)
+        self.history.append(Move(elapsed, action, x, y))
+
+    def _notify(self, cells) -> set:
+        if cells:
+            for callback in self.listeners:
+                callback(cells)
+        return cells
+
+    def adjacent(self, x, y):
+        """
+        Returns the coordinates of the (up to) 8 neighbors of a tile,
+        read from the cached neighbor table of the board size
+        :param x: index of column
+        :param y: index of row
+        :return: tuple or list of (x, y) tuples
+        """
+        cols = self.cols
+        if self._adjacent is not None:
+            return self._adjacent[y * cols + x]
+        return [(index % cols, index // cols) for index in neighbor_indices(self._neighbors, y * cols + x)]
+
+    def flagged_adjacent(self, x, y) -> int:
+        return sum(1 for cell in self.adjacent(x, y) if self.is_flagged(*cell))
+
+    def reveal(self, x, y) -> set:
+        """
+        Reveals a tile, flooding outwards from blank tiles
+        :param x: index of column
+        :param y: index of row
+        :return: set: (x, y) of every tile revealed by this move
+        """
+        if not self.playing or self.is_revealed(x, y) or self.is_flagged(x, y):
+            return set()
+        self._record('reveal', x, y)
+        return self._notify(self.flood_reveal(x, y))
+
+    def chord(self, x, y) -> set:
+        """
+        Reveals the hidden neighbors of a revealed number once all of its mines are flagged
+        :param x: index of column
+        :param y: index of row
+        :return: set: (x, y) of every tile revealed by this move
+        """
+        value = self.value(x, y)
+        if not self.playing or not self.is_revealed(x, y) or value in ('X', '0'):
+            return set()
+
+        cells = self.adjacent(x, y)
+        if self.flagged_adjacent(x, y) != int(value):
+            return set()
+
+        self._record('chord', x, y)
+        revealed = set()
+        for cell in cells:
+            if not self.is_revealed(*cell) and not self.is_flagged(*cell):
+                revealed |= self.flood_reveal(*cell)
+        return self._notify(revealed)
+
+    def flood_reveal(self, x, y) -> set:
+        """
+        Iteratively reveals a tile and, if it is blank, the connected blank region and its border.
+        Every cell is visited at most once; flagged tiles stay hidden but do not stop the flood.
+        Untouched blank regions are read from the opening index when the board has one.
+        :param x: index of column
+        :param y: index of row
+        :return: set: (x, y) of every tile revealed
+        """
+        value = self.value
+        if value(x, y) == '0':
+            if self.openings is None and self.minefield is not None:
+                self.openings = board_openings(self.minefield)
+            if self.openings is not None:
+                revealed = self._reveal_opening(x, y)
+                if revealed is not None:
+                    return revealed
+        if self._adjacent is None:
+            return self._flood_indices(x, y)
+        is_revealed = self.is_revealed
+
+        revealed = set()
+        visited = {(x, y)}
+        stack = [(x, y)]
+        while stack:
+            cell_x, cell_y = stack.pop()
+            if self._reveal_cell(cell_x, cell_y):
+                revealed.add((cell_x, cell_y))
+
+            if value(cell_x, cell_y) != '0':
+                continue
+
+            for cell in self.adjacent(cell_x, cell_y):
+                if cell not in visited and not is_revealed(*cell):
+                    visited.add(cell)
+                    stack.append(cell)
+        return revealed
+
+    def _flood_indices(self, x, y) -> set:
+        """
+        flood_reveal for boards without neighbor tuples: walks flat indices through the CSR arrays
+        and only turns the cells it reaches into (x, y)
+        :param x: index of column
+        :param y: index of row
+        :return: set: (x, y) of every tile revealed
+        """
+        value, is_revealed = self.value, self.is_revealed
+        cols, offsets, indices = self.cols, self._neighbors.offsets, self._neighbors.indices
+
+        revealed = set()
+        start = y * cols + x
+        visited = {start}
+        stack = [start]
+        while stack:
+            index = stack.pop()
+            cell_y, cell_x = divmod(index, cols)
+            if self._reveal_cell(cell_x, cell_y):
+                revealed.add((cell_x, cell_y))
+
+            if value(cell_x, cell_y) != '0':
+                continue
+
+            for neighbor in indices[offsets[index]:offsets[index + 1]]:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    if not is_revealed(neighbor % cols, neighbor // cols):
+                        stack.append(neighbor)
+        return revealed
+
+    def _reveal_opening(self, x, y):
+        """
+        Reveals the whole precomputed opening around a blank tile.
+        Only valid while none of its blanks is revealed: the flood stops at revealed tiles, so once
+        one is, tiles left hidden behind it (e.g. flagged during that flood) are out of its reach.
+        :param x: index of column
+        :param y: index of row
+        :return: set: (x, y) of every tile revealed, or None if the flood has to run instead
+        """
+        index = self.openings
+        cols, offsets = index.cols, index.offsets
+        label = index.labels[y * cols + x]
+        first, last = offsets[label], offsets[label + 1]
+        is_revealed = self.is_revealed
+        for member in index.members[first:first + index.blanks[label]]:
+            cell_y, cell_x = divmod(member, cols)
+            if is_revealed(cell_x, cell_y):
+                return None
+
+        revealed = set()
+        for member in index.members[first:last]:
+            cell_y, cell_x = divmod(member, cols)
+            if self._reveal_cell(cell_x, cell_y):
+                revealed.add((cell_x, cell_y))
+        return revealed
+
+    def toggle_flag(self, x, y) -> bool:
+        """
+        Flags or unflags a hidden tile
+        :param x: index of column
+        :param y: index of row
+        :return: bool: True if the flag state changed
+        """
+        if not self.playing or not self.tracker.set_flag(x, y, not self.is_flagged(x, y)):
+            return False
+        self._record('flag', x, y)
+        self._notify({(x, y)})
+        return True
+
+    def reveal_all(self) -> set:
+        """
+        Reveals every unflagged tile and every mine, ending the game
+        :return: set: (x, y) of every tile revealed
+        """
+        revealed = set()
+        for y in range(self.rows):
+            for x in range(self.cols):
+                if self._reveal_cell(x, y):
+                    revealed.add((x, y))
+        revealed |= self._reveal_mines()
+        self.state = EngineState.LOST
+        return self._notify(revealed)
+
+    def reveal_mines(self) -> set:
+        """
+        Reveals every mine, flagged or not
+        :return: set: (x, y) of every mine that was hidden
+        """
+        return self._notify(self._reveal_mines())
+
+    def _reveal_mines(self) -> set:
+        return {cell for cell in self.tracker.mine_cells() if self.tracker.reveal(*cell)}
+
+    def _reveal_cell(self, x, y) -> bool:
+        """
+        Reveals a single tile and updates the game state
+        :param x: index of column
+        :param y: index of row
+        :return: bool: True if the tile was revealed
+        """
+        if self.is_flagged(x, y) or not self.tracker.reveal(x, y):
+            return False
+
+        if self.is_mine(x, y):
+            self.state = EngineState.LOST
+        elif self.state == EngineState.PLAYING and self.tracker.remaining_safe == 0:
+            self.state = EngineState.WON
+        return True
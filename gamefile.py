@@ -0,0 +1,332 @@
+import mmap
+import os
+import struct
+import numpy as np
+from engine import ACTIONS, Move
+from minefield import MINE, array_to_minefield, count_adjacent, minefield_to_array
+
+#################
+# -- GLOBALS -- #
+#################
+
+VERSION = 1
+
+# File header: magic, format version, reserved
+FILE_HEADER = struct.Struct('<4sHH')
+FILE_MAGIC = b'PSWP'
+
+# Record header: record size in bytes (header included), cols, rows, mines, seed, flags, number of moves
+RECORD_HEADER = struct.Struct('<IIIIqBI')
+HAS_SEED = 1
+
+# Index footer written on close: offset of the index, number of records, magic
+INDEX_TRAILER = struct.Struct('<QI4s')
+INDEX_MAGIC = b'PIDX'
+
+
+########################
+# --STATIC FUNCTIONS-- #
+########################
+
+
+def _write_varint(out, value) -> None:
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buffer, offset) -> tuple:
+    value = shift = 0
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _zigzag(value) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value) -> int:
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+def encode_moves(moves) -> bytes:
+    """
+    Delta-encodes a move list: per move, the time since the previous move and the offset from the
+    previous move's tile are written as varints, so typical moves take 4 bytes
+    :param moves: list of engine.Move
+    :return: bytes
+    """
+    out = bytearray()
+    last_time = last_x = last_y = 0
+    for move in moves:
+        _write_varint(out, (move.time - last_time) * len(ACTIONS) + ACTIONS.index(move.action))
+        _write_varint(out, _zigzag(move.x - last_x))
+        _write_varint(out, _zigzag(move.y - last_y))
+        last_time, last_x, last_y = move.time, move.x, move.y
+    return bytes(out)
+
+
+def decode_moves(buffer, offset, count) -> list:
+    """
+    Decodes a move list written by encode_moves
+    :param buffer: bytes-like object
+    :param offset: position of the first move
+    :param count: number of moves
+    :return: list of engine.Move
+    """
+    moves = []
+    last_time = last_x = last_y = 0
+    for _ in range(count):
+        head, offset = _read_varint(buffer, offset)
+        dx, offset = _read_varint(buffer, offset)
+        dy, offset = _read_varint(buffer, offset)
+        last_time += head // len(ACTIONS)
+        last_x += _unzigzag(dx)
+        last_y += _unzigzag(dy)
+        moves.append(Move(last_time, ACTIONS[head % len(ACTIONS)], last_x, last_y))
+    return moves
+
+
+###############
+# --CLASSES-- #
+###############
+
+
+class GameRecord:
+    """
+    A board and the moves played on it
+    """
+
+    def __init__(self, cols, rows, mines, mine_bits, seed=None, moves=()):
+        """
+        Init method of GameRecord class
+        :param cols: number of cols
+        :param rows: number of rows
+        :param mines: number of mines
+        :param mine_bits: mine layout packed one bit per tile, row-major, least significant bit first
+        :param seed: seed the board was generated from [optional]
+        :param moves: list of engine.Move [optional]
+        """
+        self.cols = cols
+        self.rows = rows
+        self.mines = mines
+        self.mine_bits = bytes(mine_bits)
+        self.seed = seed
+        self.moves = list(moves)
+
+    @classmethod
+    def from_minefield(cls, minefield, seed=None, moves=()):
+        """
+        Builds a record from a 2D list of string values
+        :param minefield: 2D list of string values from generate_minefield
+        :param seed: seed the board was generated from [optional]
+        :param moves: list of engine.Move [optional]
+        :return: GameRecord
+        """
+        mine_mask = minefield_to_array(minefield) == MINE
+        rows, cols = mine_mask.shape
+        bits = np.packbits(mine_mask.ravel(), bitorder='little').tobytes()
+        return cls(cols, rows, int(mine_mask.sum()), bits, seed, moves)
+
+    @classmethod
+    def from_engine(cls, engine, seed=None):
+        """
+        Builds a record of a game from its engine and move history
+        :param engine: GameEngine over a list minefield or a storage.PackedBoard
+        :param seed: seed the board was generated from [optional]
+        :return: GameRecord
+        """
+        if engine.minefield is None:
+            board = engine.tracker
+            return cls(board.cols, board.rows, board.mines, board.mine_bits.data, seed, engine.history)
+        return cls.from_minefield(engine.minefield, seed, engine.history)
+
+    def mine_mask(self) -> np.ndarray:
+        bits = np.unpackbits(np.frombuffer(self.mine_bits, dtype=np.uint8), count=self.cols * self.rows,
+                             bitorder='little')
+        return bits.astype(bool).reshape(self.rows, self.cols)
+
+    def minefield_array(self) -> np.ndarray:
+        mine_mask = self.mine_mask()
+        field = count_adjacent(mine_mask)
+        field[mine_mask] = MINE
+        return field
+
+    def minefield(self) -> list:
+        return array_to_minefield(self.minefield_array())
+
+    def encode(self) -> bytes:
+        """
+        Serializes the record: header, bit-packed mine layout, delta-encoded moves
+        :return: bytes
+        """
+        moves = encode_moves(self.moves)
+        size = RECORD_HEADER.size + len(self.mine_bits) + len(moves)
+        header = RECORD_HEADER.pack(
+            size, self.cols, self.rows, self.mines, self.seed or 0,
+            HAS_SEED if self.seed is not None else 0, len(self.moves),
+        )
+        return header + self.mine_bits + moves
+
+    @classmethod
+    def decode(cls, buffer, offset=0, moves=True):
+        """
+        Reads a record written by encode
+        :param buffer: bytes-like object, e.g. an mmap
+        :param offset: position of the record [optional]
+        :param moves: False to skip decoding the moves [optional]
+        :return: GameRecord
+        """
+        size, cols, rows, mines, seed, flags, count = RECORD_HEADER.unpack_from(buffer, offset)
+        start = offset + RECORD_HEADER.size
+        end = start + (cols * rows + 7) // 8
+        record = cls(cols, rows, mines, buffer[start:end], seed if flags & HAS_SEED else None)
+        if moves:
+            record.moves = decode_moves(buffer, end, count)
+        return record
+
+    def __eq__(self, other):
+        return isinstance(other, GameRecord) and (
+            (self.cols, self.rows, self.mines, self.mine_bits, self.seed, self.moves)
+            == (other.cols, other.rows, other.mines, other.mine_bits, other.seed, other.moves)
+        )
+
+
+class GameWriter:
+    """
+    Appends GameRecords to a corpus file and writes the record index when closed
+    """
+
+    def __init__(self, path):
+        """
+        Init method of GameWriter class; an existing corpus is opened for appending
+        :param path: path of the corpus file
+        """
+        self.path = path
+        self.offsets = []
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self.file = open(path, 'r+b')
+            with GameFile(path) as existing:
+                self.offsets = list(existing.offsets)
+                end = existing.records_end
+            self.file.truncate(end)
+            self.file.seek(end)
+        else:
+            self.file = open(path, 'wb')
+            self.file.write(FILE_HEADER.pack(FILE_MAGIC, VERSION, 0))
+
+    def write(self, record) -> int:
+        """
+        Appends a record
+        :param record: GameRecord or bytes from GameRecord.encode
+        :return: int: index of the record in the corpus
+        """
+        data = record if isinstance(record, (bytes, bytearray)) else record.encode()
+        self.offsets.append(self.file.tell())
+        self.file.write(data)
+        return len(self.offsets) - 1
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        self.file.write(np.asarray(self.offsets, dtype='<u8').tobytes())
+        self.file.write(INDEX_TRAILER.pack(index_offset, len(self.offsets), INDEX_MAGIC))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameFile:
+    """
+    Read-only, memory-mapped view of a corpus file.
+    Only the index is read up front; each record is decoded on access.
+    """
+
+    def __init__(self, path):
+        """
+        Init method of GameFile class
+        :param path: path of the corpus file
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        if os.fstat(self._file.fileno()).st_size < FILE_HEADER.size:
+            # Also keeps mmap from failing on an empty file
+            self._file.close()
+            raise ValueError(f"{path} is not a PySweeper game file")
+        self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _ = FILE_HEADER.unpack_from(self.buffer, 0)
+        error = None
+        if magic != FILE_MAGIC:
+            error = f"{path} is not a PySweeper game file"
+        elif version > VERSION:
+            error = f"{path} uses format version {version}, newer than {VERSION}"
+        if error is not None:
+            self.buffer.close()
+            self._file.close()
+            raise ValueError(error)
+
+        self.offsets, self.records_end = self._read_index()
+
+    def _read_index(self) -> tuple:
+        """
+        Reads the index footer, or scans the record headers if the file was not closed cleanly
+        :return: (offsets of the records, position where the records end)
+        """
+        size = len(self.buffer)
+        if size >= FILE_HEADER.size + INDEX_TRAILER.size:
+            index_offset, count, magic = INDEX_TRAILER.unpack_from(self.buffer, size - INDEX_TRAILER.size)
+            if magic == INDEX_MAGIC and index_offset + count * 8 + INDEX_TRAILER.size == size:
+                offsets = np.frombuffer(self.buffer, dtype='<u8', count=count, offset=index_offset)
+                return offsets, index_offset
+
+        offsets = []
+        offset = FILE_HEADER.size
+        while offset + RECORD_HEADER.size <= size:
+            record_size = struct.unpack_from('<I', self.buffer, offset)[0]
+            if record_size < RECORD_HEADER.size or offset + record_size > size:
+                break
+            offsets.append(offset)
+            offset += record_size
+        return np.asarray(offsets, dtype='<u8'), offset
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index) -> GameRecord:
+        return GameRecord.decode(self.buffer, int(self.offsets[index]))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def board(self, index) -> GameRecord:
+        """
+        Decodes only the board of a record, skipping its moves
+        :param index: index of the record
+        :return: GameRecord without moves
+        """
+        return GameRecord.decode(self.buffer, int(self.offsets[index]), moves=False)
+
+    def close(self) -> None:
+        # Drop the index view before closing the map it points into
+        self.offsets = None
+        self.buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,12 +1,17 @@
 #  import pprint as pp  # DEBUG
-import random
-import os
+import argparse
 import tkinter as tk
-from tkinter import ttk
+from tkinter import filedialog, messagebox, simpledialog, ttk
 from enum import Enum
-from collections import namedtuple
-from PIL import ImageTk, Image
+from assets import Assets
 from menu import MenuBar
+from minefield import Difficulty, difficulty_dict
+from noguess import default_start
+from prefetch import BoardPrefetcher
+from engine import GameEngine, edge_case
+from solver import Solver
+from gamefile import GameFile, GameRecord, GameWriter
+from replay import Replay
 
 #################
 # -- GLOBALS -- #
@@ -14,127 +19,78 @@ from menu import MenuBar
 
 # random.seed(2)  # DEBUG
 
-root = tk.Tk()
+RENDERERS = ('label', 'canvas', 'viewport')
 
-Difficulty = namedtuple("Beginner", "mines cols rows")
 
-difficulty_dict = {
-    'beginner': Difficulty(10, 9, 9),
-    'intermediate': Difficulty(40, 15, 15),
-    'expert': Difficulty(99, 30, 16)
-}
-
-
-########################
-# --STATIC FUNCTIONS-- #
-########################
+###############
+# --CLASSES-- #
+###############
 
 
-def load_images() -> dict:
+class GameState(Enum):
     """
-    Uses the PIL module to load and convert png files for use by tkinter
-    :return: dict: dict:key: image name, dict:value: ImageTK.Photoimage object
+    Enum holding game state
     """
-    image_dict = {}
-    image_files = os.listdir(f"{os.getcwd()}/images")
-    for file in image_files:
-        image_dict[file[:-4]] = ImageTk.PhotoImage(Image.open(f"images/{file}"))
-    return image_dict
+    IDLE = 0
+    PLAYING = 1
+    REPLAY = 2
 
 
-def generate_minefield(mines, cols, rows) -> list:
+class RedrawScheduler:
     """
-    Generates a 2D list of string value representing the state of a tile.
-    A number (0-8) denotes the total number of mines found on it's 8 adjacent neighbors
-    An 'x' denotes a mine
-    :param mines: number of mines
-    :param cols: number of cols
-    :param rows: number of rows
-    :return: list
+    Collects the cells changed by moves and hover events and applies them to the board once per frame.
+    A cell marked several times before the flush is drawn once, in its latest state.
     """
-    probability = mines / (cols * rows)
-
-    grid = [["." for _ in range(cols)] for _ in range(rows)]
-
-    mine_count = mines
-
-    # Add Mines
-    y_index = 0
-    x_index = 0
-
-    while mine_count > 0:
-        # DEBUG
-        # random.seed(1234)
-
-        if random.random() < probability:
-            try:
-                grid[y_index][x_index] = "X"
-                mine_count -= 1
-            except IndexError as e:
-                print(e)
-                print(f"y: {y_index}, x: {x_index}")
-                print(f"grid max: {len(grid)},{len(grid[0])}")
-
-        x_index = (x_index + 1) % cols
-        if x_index == 0:
-            y_index = (y_index + 1) % rows
-
-    # add numbers
-
-    for grid_y, row in enumerate(grid):
-        for grid_x, cell in enumerate(row):
-
-            # Check all 8 adjacent neighbors
-            count = 0
-            for i in range(-1, 2):
-                for j in range(-1, 2):
-                    if grid[grid_y][grid_x] == "X":
-                        continue
-                    if (
-                            grid_y + i < 0
-                            or grid_y + i > rows - 1
-                            or grid_x + j < 0
-                            or grid_x + j > cols - 1
-                    ):
-                        continue
-                    if i == 0 and j == 0:
-                        continue
-
-                    if grid[grid_y + i][grid_x + j] == "X":
-                        count += 1
-                    if count > 0:
-                        grid[grid_y][grid_x] = str(count)
-                    else:
-                        grid[grid_y][grid_x] = str(0)
-
-    # DEBUG
-    # pp.pprint(grid)
-    return grid
-
-
-def edge_case(dx, dy, width, height) -> bool:
-    return dx < 0 or dx > width - 1 or dy < 0 or dy > height - 1
 
+    def __init__(self, controller):
+        """
+        Init method of RedrawScheduler class
+        :param controller: game controller object
+        """
+        self.controller = controller
+        self.dirty = set()
+        self.job = None
 
-###############
-# --CLASSES-- #
-###############
+    def mark(self, cells) -> None:
+        """
+        Marks cells for redrawing and schedules a flush for when Tk is next idle
+        :param cells: (x, y) of the changed cells
+        :return: None
+        """
+        if not cells:
+            return
+        self.dirty.update(cells)
+        if self.job is None:
+            self.job = self.controller.root.after_idle(self.flush)
 
+    def flush(self) -> None:
+        """
+        Redraws every dirty cell in one batch
+        :return: None
+        """
+        self.job = None
+        cells, self.dirty = self.dirty, set()
+        if cells:
+            self.controller.board.redraw(cells)
 
-class GameState(Enum):
-    """
-    Enum holding game state
-    """
-    IDLE = 0
-    PLAYING = 1
+    def cancel(self) -> None:
+        """
+        Drops pending cells, e.g. before the board is rebuilt
+        :return: None
+        """
+        if self.job is not None:
+            self.controller.root.after_cancel(self.job)
+            self.job = None
+        self.dirty.clear()
 
 
 class Tile:
     """
-    Tile Class used to visually represent a clickable tile
+    Tile Class used to visually represent a clickable tile.
+    The state of the tile is owned by the controller's GameEngine.
     """
 
-    def __init__(self, master, controller, x, y, image, value):
+    def __init__(self, master, controller, x, y, image):
         """
         Init method of Tile class
         :param master: tk.Widget object acting as master for tk.Label widget of Tile class
@@ -142,8 +98,6 @@ class Tile:
         :param x: index of column
         :param y: index of row
         :param image: ImageTk.Photoimage object
-        :param value: string value of tile representing a mine or a number from 0-9 representeing
-        the number of mines around it's 8 adjacent neighbors
         """
         self.label = tk.Label(master, image=image)
         # super().__init__(master, image=image)
@@ -152,15 +106,24 @@ class Tile:
         self.x = x
         self.y = y
         self.image = image
-        self.value = value
 
-        self.revealed = False
         self._mouse_right_pressed = False
 
         self.entered = False
-        self.flagged = False
         self._set_binds()
 
+    @property
+    def value(self) -> str:
+        return self.controller.engine.value(self.x, self.y)
+
+    @property
+    def revealed(self) -> bool:
+        return self.controller.engine.is_revealed(self.x, self.y)
+
+    @property
+    def flagged(self) -> bool:
+        return self.controller.engine.is_flagged(self.x, self.y)
+
     def _set_binds(self) -> None:
         """
         Binds mouse events (enter, leave, click, press, release) to tk.Label attribute of Tile Class
@@ -182,7 +145,7 @@ class Tile:
         """
         # print(f"Entering: {self.x}, {self.y}")
         self.entered = True
-        self._update_image()
+        self.controller.scheduler.mark({(self.x, self.y)})
 
     def _on_leave(self, event) -> None:
         """
@@ -192,7 +155,7 @@ class Tile:
         """
         # print(f"Leaving:  {self.x}, {self.y}")
         self.entered = False
-        self._update_image()
+        self.controller.scheduler.mark({(self.x, self.y)})
 
     def _on_click(self, event) -> None:
         """
@@ -203,13 +166,10 @@ class Tile:
         # print(f"Mouse L: {self.x}, {self.y}")
         if self.controller.game_state == GameState.PLAYING:
             if not self.revealed:
-                if self.value == '0':
-                    self.controller.recursive_reveal(self)
-                else:
-                    self.reveal_tile()
+                self.controller.reveal_tile(self.x, self.y)
             else:
                 if self._mouse_right_pressed and int(self.value) in range(1, 9):
-                    self.controller.reveal_flagged(self)
+                    self.controller.reveal_flagged(self.x, self.y)
 
     def _on_right_click(self, event) -> None:
         """
@@ -229,9 +189,7 @@ class Tile:
         # print(f"Mouse Down: {self.x}, {self.y}")
         if self.controller.game_state == GameState.PLAYING:
             if not self.revealed:
-                self.flagged = not self.flagged
-                self._update_image()
-                self.controller.update_flagged(self)
+                self.controller.toggle_flag(self.x, self.y)
             else:
                 self._mouse_right_pressed = True
 
@@ -249,37 +207,10 @@ class Tile:
         Updates the image attribute of the tk.Label object of the Tile class based on the state of the Tile
         :return: None
         """
-        # image = self.image
-        if not self.revealed:
-            if self.entered:
-                if self.flagged:
-                    image = self.controller.images['flag_hover']
-                else:
-                    image = self.controller.images['tile_hover']
-            else:
-                if self.flagged:
-                    image = self.controller.images['flag_normal']
-                else:
-                    image = self.controller.images['tile_normal']
-        else:
-            image = self.controller.images[self.value]
-        self.label.config(image=image)
-        self.image = image
-
-    def reveal_tile(self) -> None:
-        """
-        Changes the image of the tile to reveal the value
-        :return: None
-        """
-        if not self.flagged:
-            self.revealed = True
-            self._update_image()
-            self.controller.revealed_count += 1
-            if self.value == 'X':
-                self.controller.game_over()
-                # print("GAME OVER")  # DEBUG
-            else:
-                self.controller.check_win()
+        image = self.controller.tile_image(self.x, self.y, self.entered)
+        if image is not self.image:
+            self.label.config(image=image)
+            self.image = image
 
     def place(self) -> None:
         """
@@ -307,6 +238,8 @@ class Board:
         """
         self.master = master
         self.controller = controller
+        self.cols = self.controller.cols
+        self.rows = self.controller.rows
         self.frame = tk.Frame(self.master)
         self._config_frame()
 
@@ -320,6 +253,38 @@ class Board:
 
         self.frame.config(width=width, height=height)
 
+    def redraw(self, cells) -> None:
+        """
+        Applies a batch of changed cells to their tiles in a single pass
+        :param cells: (x, y) of every changed tile
+        :return: None
+        """
+        tilegrid = self.controller.tilegrid
+        for x, y in cells:
+            tilegrid[y][x]._update_image()
+
+    def highlight(self, x, y) -> None:
+        """
+        Shows a tile with its hover image, e.g. to point out a hint
+        :param x: index of column
+        :param y: index of row
+        :return: None
+        """
+        self.controller.tilegrid[y][x].entered = True
+        self.controller.scheduler.mark({(x, y)})
+
+    def reset(self) -> None:
+        """
+        Returns every existing Tile to its unrevealed look for a new game of the same size
+        :return: None
+        """
+        for row in self.controller.tilegrid:
+            for tile in row:
+                tile.entered = False
+                tile._mouse_right_pressed = False
+                tile._set_binds()
+                tile._update_image()
+
     def place_tiles(self) -> None:
         """
         Renders all Tile objects to tk.Frame object of Board class
@@ -338,6 +303,432 @@ class Board:
         self.frame.pack(expand=True, fill=tk.BOTH, pady=2)
 
 
+class CanvasBoard:
+    """
+    Board class drawing every tile as an image item on a single tk.Canvas.
+    Mouse events are bound once on the canvas and mapped to cells arithmetically.
+    """
+
+    def __init__(self, master, controller):
+        """
+        Init method of CanvasBoard class
+        :param master: tk.Widget object acting as master for tk.Canvas widget of CanvasBoard class
+        :param controller: game controller object
+        """
+        self.master = master
+        self.controller = controller
+        self.cols = self.controller.cols
+        self.rows = self.controller.rows
+        self.pitch = self.controller.cell_size + 1
+        self.frame = self.canvas = tk.Canvas(self.master, borderwidth=0, highlightthickness=0)
+        self.items = []
+        self.shown = []
+        self.hover = None
+
+        self._mouse_right_pressed = False
+        self._config_frame()
+        self._set_binds()
+
+    def _config_frame(self) -> None:
+        """
+        Sets width and height of tk.Canvas widget of CanvasBoard class
+        :return: None
+        """
+        width = self.controller.cols * self.pitch
+        height = self.controller.rows * self.pitch
+
+        self.canvas.config(width=width, height=height)
+
+    def _set_binds(self) -> None:
+        """
+        Binds mouse events (motion, leave, click, press, release) to tk.Canvas attribute of CanvasBoard Class
+        :return: None
+        """
+        if self.controller.game_state == GameState.PLAYING:
+            self.canvas.bind("<Motion>", self._on_motion)
+            self.canvas.bind("<Leave>", self._on_leave)
+            self.canvas.bind("<Button-1>", self._on_click)
+            self.canvas.bind("<ButtonPress-3>", self._on_right_mouse_down)
+            self.canvas.bind("<ButtonRelease-3>", self._on_right_mouse_up)
+
+    def cell_at(self, px, py):
+        """
+        Maps a pixel position on the canvas to the cell under it
+        :param px: x pixel coordinate
+        :param py: y pixel coordinate
+        :return: (x, y) of the cell or None if outside the board
+        """
+        x = px // self.pitch
+        y = py // self.pitch
+        if edge_case(x, y, self.controller.cols, self.controller.rows):
+            return None
+        return x, y
+
+    def _set_hover(self, cell) -> None:
+        """
+        Moves the hover highlight to a new cell
+        :param cell: (x, y) of the hovered cell or None
+        :return: None
+        """
+        if cell == self.hover:
+            return
+        changed = {c for c in (self.hover, cell) if c is not None}
+        self.hover = cell
+        self.controller.scheduler.mark(changed)
+
+    def _on_motion(self, event) -> None:
+        """
+        Handles mouse-motion event on tk.Canvas object of CanvasBoard class
+        :param event:
+        :return: None
+        """
+        self._set_hover(self.cell_at(event.x, event.y))
+
+    def _on_leave(self, event) -> None:
+        """
+        Handles mouse-exit event on tk.Canvas object of CanvasBoard class
+        :param event:
+        :return: None
+        """
+        self._set_hover(None)
+
+    def _on_click(self, event) -> None:
+        """
+        Handles mouse-click (once) event on tk.Canvas object of CanvasBoard class
+        :param event:
+        :return: None
+        """
+        cell = self.cell_at(event.x, event.y)
+        if cell is None or self.controller.game_state != GameState.PLAYING:
+            return
+
+        engine = self.controller.engine
+        if not engine.is_revealed(*cell):
+            self.controller.reveal_tile(*cell)
+        elif self._mouse_right_pressed and engine.value(*cell) not in ('0', 'X'):
+            self.controller.reveal_flagged(*cell)
+
+    def _on_right_mouse_down(self, event) -> None:
+        """
+        Handles mouse-right pressed (held) event on tk.Canvas object of CanvasBoard class
+        :param event:
+        :return: None
+        """
+        cell = self.cell_at(event.x, event.y)
+        if cell is None or self.controller.game_state != GameState.PLAYING:
+            return
+
+        if not self.controller.engine.is_revealed(*cell):
+            self.controller.toggle_flag(*cell)
+        else:
+            self._mouse_right_pressed = True
+
+    def _on_right_mouse_up(self, event) -> None:
+        """
+        Handles mouse-right released event on tk.Canvas object of CanvasBoard class
+        :param event:
+        :return: None
+        """
+        self._mouse_right_pressed = False
+
+    def redraw(self, cells) -> None:
+        """
+        Applies a batch of changed cells to their canvas image items in a single pass
+        :param cells: (x, y) of every changed tile
+        :return: None
+        """
+        cols = self.controller.cols
+        for x, y in cells:
+            image = self.controller.tile_image(x, y, (x, y) == self.hover)
+            index = y * cols + x
+            if image is not self.shown[index]:
+                self.canvas.itemconfigure(self.items[index], image=image)
+                self.shown[index] = image
+
+    def highlight(self, x, y) -> None:
+        """
+        Shows a tile with its hover image, e.g. to point out a hint
+        :param x: index of column
+        :param y: index of row
+        :return: None
+        """
+        self._set_hover((x, y))
+
+    def reset(self) -> None:
+        """
+        Returns every image item to its unrevealed look for a new game of the same size
+        :return: None
+        """
+        self.hover = None
+        self._mouse_right_pressed = False
+        self._set_binds()
+        image = self.controller.images['tile_normal']
+        for item in self.items:
+            self.canvas.itemconfigure(item, image=image)
+        self.shown = [image] * len(self.items)
+
+    def place_tiles(self) -> None:
+        """
+        Creates one image item per tile on the tk.Canvas object of CanvasBoard class
+        :return: None
+        """
+        image = self.controller.images['tile_normal']
+        self.items = [
+            self.canvas.create_image(x * self.pitch, y * self.pitch, image=image, anchor=tk.NW)
+            for y in range(self.controller.rows)
+            for x in range(self.controller.cols)
+        ]
+        self.shown = [image] * len(self.items)
+
+    def show(self) -> None:
+        """
+        Renders tk.Canvas object of CanvasBoard class
+        :return:
+        """
+        self.frame.pack(expand=True, fill=tk.BOTH, pady=2)
+
+
+class ViewportBoard(CanvasBoard):
+    """
+    CanvasBoard for boards larger than the screen.
+    The canvas scrolls and zooms over the whole board but only holds image items for the cells in view
+    plus a margin; cells scrolled into view take their state from the engine, and the items of cells
+    scrolled out are reused.
+    """
+    MARGIN = 2
+    ZOOMS = (0.25, 0.5, 0.75, 1.0, 1.5, 2.0)
+    # Largest view, as a fraction of the screen
+    SCREEN_FRACTION = 0.8
+
+    def __init__(self, master, controller):
+        """
+        Init method of ViewportBoard class
+        :param master: tk.Widget object acting as master for tk.Frame widget of ViewportBoard class
+        :param controller: game controller object
+        """
+        self.master = master
+        self.controller = controller
+        self.cols = self.controller.cols
+        self.rows = self.controller.rows
+        self.zoom = 1.0
+        self.pitch = self.cell_pixels + 1
+        self.cells = {}
+        self.shown = {}
+        self.free = []
+        self.visible = None
+        self.hover = None
+        self._mouse_right_pressed = False
+
+        self.frame = tk.Frame(self.master)
+        self.canvas = tk.Canvas(self.frame, borderwidth=0, highlightthickness=0)
+        self.x_scrollbar = tk.Scrollbar(self.frame, orient=tk.HORIZONTAL, command=self._xview)
+        self.y_scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._yview)
+        self.canvas.config(xscrollcommand=self.x_scrollbar.set, yscrollcommand=self.y_scrollbar.set)
+        self.x_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.y_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self._config_frame()
+        self._set_binds()
+        self.canvas.bind("<Configure>", lambda event: self._refresh())
+
+    @property
+    def cell_pixels(self) -> int:
+        return max(1, round(self.controller.cell_size * self.zoom))
+
+    def _config_frame(self) -> None:
+        """
+        Sizes the view to the board or to a part of the screen, whichever is smaller
+        :return: None
+        """
+        self.pitch = self.cell_pixels + 1
+        width = self.controller.cols * self.pitch
+        height = self.controller.rows * self.pitch
+        self.canvas.config(
+            scrollregion=(0, 0, width, height),
+            width=min(width, int(self.master.winfo_screenwidth() * self.SCREEN_FRACTION)),
+            height=min(height, int(self.master.winfo_screenheight() * self.SCREEN_FRACTION)),
+        )
+
+    def _set_binds(self) -> None:
+        """
+        Binds the CanvasBoard mouse events, plus wheel scrolling, ctrl+wheel zoom and middle-button panning
+        :return: None
+        """
+        super()._set_binds()
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", self._on_wheel)
+        self.canvas.bind("<Button-5>", self._on_wheel)
+        self.canvas.bind("<ButtonPress-2>", lambda event: self.canvas.scan_mark(event.x, event.y))
+        self.canvas.bind("<B2-Motion>", self._on_drag)
+
+    def view_size(self) -> tuple:
+        return int(self.canvas.cget('width')), int(self.canvas.cget('height'))
+
+    def cell_at(self, px, py):
+        """
+        Maps a pixel position in the view to the cell under it
+        :param px: x pixel coordinate
+        :param py: y pixel coordinate
+        :return: (x, y) of the cell or None if outside the board
+        """
+        return super().cell_at(int(self.canvas.canvasx(px)), int(self.canvas.canvasy(py)))
+
+    def _xview(self, *args) -> None:
+        self.canvas.xview(*args)
+        self._refresh()
+
+    def _yview(self, *args) -> None:
+        self.canvas.yview(*args)
+        self._refresh()
+
+    def _on_drag(self, event) -> None:
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self._refresh()
+
+    def _on_wheel(self, event) -> None:
+        """
+        Handles mouse-wheel events: scrolls, horizontally with shift, or zooms with ctrl
+        :param event:
+        :return: None
+        """
+        step = -1 if event.num == 4 or getattr(event, 'delta', 0) > 0 else 1
+        if event.state & 0x4:
+            index = self.ZOOMS.index(self.zoom) - step
+            self.set_zoom(self.ZOOMS[max(0, min(len(self.ZOOMS) - 1, index))], event.x, event.y)
+        elif event.state & 0x1:
+            self._xview('scroll', step * 3, 'units')
+        else:
+            self._yview('scroll', step * 3, 'units')
+
+    def set_zoom(self, zoom, px=None, py=None) -> None:
+        """
+        Changes the zoom level, keeping the board point under (px, py) in place
+        :param zoom: entry of ZOOMS
+        :param px: x pixel coordinate in the view, the centre if None [optional]
+        :param py: y pixel coordinate in the view, the centre if None [optional]
+        :return: None
+        """
+        if zoom == self.zoom:
+            return
+        view_width, view_height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        px = view_width // 2 if px is None else px
+        py = view_height // 2 if py is None else py
+        # Board position under the pointer, in cells
+        anchor_x = self.canvas.canvasx(px) / self.pitch
+        anchor_y = self.canvas.canvasy(py) / self.pitch
+
+        self.zoom = zoom
+        self.canvas.delete(tk.ALL)
+        self.cells, self.shown, self.free, self.visible = {}, {}, [], None
+        self._config_frame()
+        self.canvas.xview_moveto((anchor_x * self.pitch - px) / (self.controller.cols * self.pitch))
+        self.canvas.yview_moveto((anchor_y * self.pitch - py) / (self.controller.rows * self.pitch))
+        self._refresh()
+
+    def _image(self, x, y):
+        name = self.controller.tile_name(x, y, (x, y) == self.hover)
+        return self.controller.images.get(name, self.zoom)
+
+    def _visible_range(self) -> tuple:
+        """
+        Returns the cells in view plus the margin
+        :return: (x0, y0, x1, y1), half-open
+        """
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            # Not mapped yet: use the requested size
+            width, height = self.view_size()
+        left, top = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        return (
+            max(0, int(left // self.pitch) - self.MARGIN),
+            max(0, int(top // self.pitch) - self.MARGIN),
+            min(self.controller.cols, int((left + width) // self.pitch) + 1 + self.MARGIN),
+            min(self.controller.rows, int((top + height) // self.pitch) + 1 + self.MARGIN),
+        )
+
+    def _refresh(self) -> None:
+        """
+        Drops the items of cells scrolled out of view and draws the cells scrolled into it
+        :return: None
+        """
+        visible = self._visible_range()
+        if visible == self.visible:
+            return
+        self.visible = visible
+        x0, y0, x1, y1 = visible
+
+        canvas = self.canvas
+        for cell in [cell for cell in self.cells if not (x0 <= cell[0] < x1 and y0 <= cell[1] < y1)]:
+            item = self.cells.pop(cell)
+            del self.shown[cell]
+            canvas.itemconfigure(item, state=tk.HIDDEN)
+            self.free.append(item)
+
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                if (x, y) in self.cells:
+                    continue
+                image = self._image(x, y)
+                if self.free:
+                    item = self.free.pop()
+                    canvas.coords(item, x * self.pitch, y * self.pitch)
+                    canvas.itemconfigure(item, image=image, state=tk.NORMAL)
+                else:
+                    item = canvas.create_image(x * self.pitch, y * self.pitch, image=image, anchor=tk.NW)
+                self.cells[(x, y)] = item
+                self.shown[(x, y)] = image
+
+    def redraw(self, cells) -> None:
+        """
+        Applies a batch of changed cells to the items in view; the others are drawn when scrolled to
+        :param cells: (x, y) of every changed tile
+        :return: None
+        """
+        if len(cells) > len(self.cells):
+            cells = [cell for cell in self.cells if cell in cells]
+        for cell in cells:
+            item = self.cells.get(cell)
+            if item is None:
+                continue
+            image = self._image(*cell)
+            if image is not self.shown[cell]:
+                self.canvas.itemconfigure(item, image=image)
+                self.shown[cell] = image
+
+    def highlight(self, x, y) -> None:
+        """
+        Scrolls a tile into view and shows it with its hover image, e.g. to point out a hint
+        :param x: index of column
+        :param y: index of row
+        :return: None
+        """
+        x0, y0, x1, y1 = self.visible or self._visible_range()
+        if not (x0 + self.MARGIN <= x < x1 - self.MARGIN and y0 + self.MARGIN <= y < y1 - self.MARGIN):
+            width, height = self.view_size()
+            self.canvas.xview_moveto(((x + 0.5) * self.pitch - width / 2) / (self.controller.cols * self.pitch))
+            self.canvas.yview_moveto(((y + 0.5) * self.pitch - height / 2) / (self.controller.rows * self.pitch))
+            self._refresh()
+        self._set_hover((x, y))
+
+    def reset(self) -> None:
+        """
+        Returns every item in view to its unrevealed look for a new game of the same size
+        :return: None
+        """
+        self.hover = None
+        self._mouse_right_pressed = False
+        self._set_binds()
+        self.redraw(set(self.cells))
+
+    def place_tiles(self) -> None:
+        """
+        Creates the image items of the cells in view
+        :return: None
+        """
+        self._refresh()
+
+
 class Timer(tk.Label):
     """
     Timer class used to increment the timer
@@ -449,7 +840,6 @@ class HotBar:
         """
         var = f"{value:02}"
         self.mine_var.set(var)
-        self.controller.root.update_idletasks()
 
     def update_button_image(self) -> None:
         """
@@ -466,19 +856,34 @@ class PySweeper:
     """
     Game controller class that holds game logic
     """
-    def __init__(self, rt: tk.Tk):
+    def __init__(self, rt: tk.Tk, renderer='label'):
         """
         Init method of PySweeper class
         :param rt: root tk window (tk.Tk object)
+        :param renderer: 'label' for one tk.Label per tile, 'canvas' for a single tk.Canvas,
+        'viewport' for a scrolling canvas that only draws the tiles in view [optional]
         """
+        if renderer not in RENDERERS:
+            raise ValueError(f"unknown renderer {renderer!r}, expected one of {RENDERERS}")
+
         self.cell_size = 30
+        self.renderer = renderer
         self.game_state = GameState.IDLE
-        self.revealed_count = 0
         self.root = rt
-        self.images = load_images()
+        self.images = Assets(rt)
+        self.scheduler = RedrawScheduler(self)
+        self.prefetcher = BoardPrefetcher()
+        self.no_guess = False
         self._init_gui()
         self.minefield = None
+        self.seed = None
+        self.custom = None
+        self.engine = None
+        self.solver = None
         self.tilegrid = None
+        self.replay = None
+        self.replay_speed = 1.0
+        self._replay_job = None
 
         self.on_difficulty_change('beginner')
 
@@ -494,13 +899,11 @@ class PySweeper:
 
     def _change_difficulty(self, diff) -> None:
         self.difficulty = diff
-        level = difficulty_dict[diff]
+        level = self.custom if diff == 'custom' else difficulty_dict[diff]
         self.mines = level.mines
-        self.tiles_flagged = 0
-        self.revealed_count = 0
         self.cols = level.cols
         self.rows = level.rows
-        self.hotbar.update_mine_label(self.mines - self.tiles_flagged)
+        self.hotbar.update_mine_label(self.mines)
 
     def _add_hotbar(self) -> None:
         self.hotbar = HotBar(self.root, self)
@@ -509,21 +912,42 @@ class PySweeper:
         # self.root.update()
         # print(self.hotbar.frame.winfo_width(), self.hotbar.frame.winfo_height())
 
+    def _fits_screen(self) -> bool:
+        width = (self.cell_size + 1) * self.cols
+        height = (self.cell_size + 1) * self.rows
+        fraction = ViewportBoard.SCREEN_FRACTION
+        return width <= self.root.winfo_screenwidth() * fraction and height <= self.root.winfo_screenheight() * fraction
+
     def _add_board(self) -> None:
-        self.board = Board(self.root, self)
-        self.tilegrid = self._generate_tilegrid()
+        self.tilegrid = None
+        if self.renderer == 'viewport' or not self._fits_screen():
+            # Boards that do not fit on screen always get a scrolling view
+            self.board = ViewportBoard(self.root, self)
+        elif self.renderer == 'canvas':
+            self.board = CanvasBoard(self.root, self)
+        else:
+            self.board = Board(self.root, self)
+            self.tilegrid = self._generate_tilegrid()
         self.board.place_tiles()
         self.board.show()
-        width = self.cell_size * self.cols + self.cols + 2
-        height = self.cell_size * self.rows + self.rows + 2
-        self._set_geometry(width, height + 55)
+
+        if isinstance(self.board, ViewportBoard):
+            self.root.resizable(True, True)
+            width, height = self.board.view_size()
+            # Room for the scrollbars
+            width, height = width + 20, height + 20
+        else:
+            self.root.resizable(False, False)
+            width = self.cell_size * self.cols + self.cols
+            height = self.cell_size * self.rows + self.rows
+        self._set_geometry(width + 2, height + 2 + 55)
 
     def _set_geometry(self, width, height):
         self.root.geometry(f"{width}x{height}")
 
     def _add_menubar(self) -> None:
-        menu_bar = MenuBar(master=self.root, controller=self)
-        self.root.config(menu=menu_bar)
+        self.menu_bar = MenuBar(master=self.root, controller=self)
+        self.root.config(menu=self.menu_bar)
 
     def _generate_tilegrid(self) -> list:
         grid = []
@@ -531,66 +955,143 @@ class PySweeper:
             row = []
             for x in range(self.cols):
                 image = self.images['tile_normal']
-                value = self.minefield[y][x]
-                tile = Tile(self.board.frame, self, x, y, image, value)
+                tile = Tile(self.board.frame, self, x, y, image)
                 row.append(tile)
             grid.append(row)
 
         return grid
 
-    def _get_adjacent_tiles(self, tile) -> list:
-        tiles = []
-        for i in range(-1, 2):
-            for j in range(-1, 2):
-
-                if edge_case(tile.x + j, tile.y + i, self.cols, self.rows):
-                    continue
-
-                if i == 0 and j == 0:
-                    continue
-
-                tiles.append(self.tilegrid[tile.y + i][tile.x + j])
-        return tiles
+    def tile_name(self, x, y, entered=False) -> str:
+        """
+        Picks the image name for a tile based on its state in the engine
+        :param x: index of column
+        :param y: index of row
+        :param entered: True if the mouse is over the tile [optional]
+        :return: str: key of self.images
+        """
+        engine = self.engine
+        if not engine.is_revealed(x, y):
+            if entered:
+                if engine.is_flagged(x, y):
+                    return 'flag_hover'
+                return 'tile_hover'
+            if engine.is_flagged(x, y):
+                return 'flag_normal'
+            return 'tile_normal'
+        return engine.value(x, y)
+
+    def tile_image(self, x, y, entered=False):
+        """
+        Picks the image for a tile based on its state in the engine
+        :param x: index of column
+        :param y: index of row
+        :param entered: True if the mouse is over the tile [optional]
+        :return: tk.PhotoImage object
+        """
+        return self.images[self.tile_name(x, y, entered)]
 
-    def _get_flagged_count(self, tiles) -> int:
-        flagged = 0
-        for tile in tiles:
-            if tile.flagged:
-                flagged += 1
+    def _update_tiles(self, cells) -> None:
+        """
+        Redraws the tiles changed by an engine move and reacts to a win or loss
+        :param cells: (x, y) of every tile changed by the move
+        :return: None
+        """
+        self.scheduler.mark(cells)
 
-        return flagged
+        if self.engine.lost:
+            self.game_over()
+        elif self.engine.won:
+            self.win()
 
     def start_game(self) -> None:
+        if self.game_state == GameState.REPLAY:
+            self.stop_replay()
         if self.game_state == GameState.IDLE:
             self.game_state = GameState.PLAYING
             self.on_difficulty_change(self.difficulty)
             self.hotbar.timer.reset()
             self.hotbar.timer.start()
+            if self.no_guess:
+                # No-guess boards are only guaranteed from the tile they were searched from
+                self.reveal_tile(*default_start(self.cols, self.rows))
 
     def on_difficulty_change(self, difficulty) -> None:
         self._change_difficulty(difficulty)
-        self.minefield = generate_minefield(self.mines, self.cols, self.rows)
+        level = Difficulty(self.mines, self.cols, self.rows)
+        try:
+            self.seed, self.minefield, openings = self.prefetcher.take(level, self.no_guess)
+        except ValueError as e:
+            # Only no-guess boards can fail; fall back to a plain board rather than leave the window without one
+            self.no_guess = False
+            self.menu_bar.no_guess.set(False)
+            message = f"Could not deal a board: {e}. No Guessing was turned off."
+            messagebox.showerror("No Guessing", message, parent=self.root)
+            self.seed, self.minefield, openings = self.prefetcher.take(level)
+        self.engine = GameEngine(self.minefield, openings=openings)
+        self.solver = None
         self.draw()
 
+    def custom_game(self, mines=None, cols=None, rows=None) -> None:
+        """
+        Starts a game of any size; boards larger than the screen are shown in a scrolling view
+        :param mines: number of mines, asked for with a dialog if any value is missing [optional]
+        :param cols: number of cols [optional]
+        :param rows: number of rows [optional]
+        :return: None
+        :raises ValueError: if the given values make no valid board; dialog answers are reported in a message box
+        """
+        asked = None in (mines, cols, rows)
+        if asked:
+            current = self.custom or difficulty_dict[self.difficulty]
+            answer = simpledialog.askstring(
+                "Custom", "Mines, columns and rows:", parent=self.root, initialvalue=" ".join(map(str, current))
+            )
+            if answer is None:
+                return
+            try:
+                mines, cols, rows = (int(value) for value in answer.replace(',', ' ').split())
+            except ValueError:
+                messagebox.showerror("Custom", f"Expected three whole numbers, got {answer!r}", parent=self.root)
+                return
+        if cols < 1 or rows < 1 or not 0 <= mines < cols * rows:
+            message = f"No board of {cols}x{rows} can hold {mines} mines"
+            if asked:
+                # Raising inside a Tk callback would only print a traceback to the console
+                messagebox.showerror("Custom", message, parent=self.root)
+                return
+            raise ValueError(message)
+
+        self.custom = Difficulty(mines, cols, rows)
+        self.on_difficulty_change('custom')
+
+    def set_no_guess(self, no_guess) -> None:
+        """
+        Switches to boards that can be cleared by logic alone, opened at their centre tile when the game starts
+        :param no_guess: bool
+        :return: None
+        """
+        self.no_guess = no_guess
+        self.on_difficulty_change(self.difficulty)
+
     def draw(self):
+        self.scheduler.cancel()
         if hasattr(self, 'board'):
+            if (self.board.cols, self.board.rows) == (self.cols, self.rows):
+                # Same geometry: keep the widgets and only reset their state
+                self.board.reset()
+                return
             self.board.frame.destroy()
             self.__delattr__('board')
 
         self._add_board()
 
-    def update_flagged(self, tile):
-        if tile.flagged:
-            self.tiles_flagged += 1
-        else:
-            self.tiles_flagged -= 1
-        self.hotbar.update_mine_label(self.mines - self.tiles_flagged)
+    def reveal_tile(self, x, y) -> None:
+        self._update_tiles(self.engine.reveal(x, y))
 
-    def check_win(self):
-        # print(self.revealed_count)  # DEBUG
-        if self.revealed_count == self.rows * self.cols - self.mines:
-            # print("WINNER")  # DEBUG
-            self.win()
+    def toggle_flag(self, x, y) -> None:
+        if self.engine.toggle_flag(x, y):
+            self.scheduler.mark({(x, y)})
+            self.hotbar.update_mine_label(self.engine.mines_left)
 
     def win(self):
         self.game_state = GameState.IDLE
@@ -620,47 +1121,146 @@ class PySweeper:
         text_box.pack()
         ok_button.pack()
 
-    def reveal_flagged(self, tile):
-        # print(f"Tile: {tile}")  # DEBUG
-        # print(f"{tile.value}")  # DEBUG
-        tiles = self._get_adjacent_tiles(tile)
-        flagged_count = self._get_flagged_count(tiles)
+    def reveal_flagged(self, x, y):
+        self._update_tiles(self.engine.chord(x, y))
 
-        if flagged_count == int(tile.value):
-            for t in tiles:
-                if not t.revealed and not t.flagged:
-                    if t.value == 'X':
-                        t.reveal_tile()
+    def _get_solver(self) -> Solver:
+        # Built on first use, as its setup scans every tile, which shows on huge boards
+        if self.solver is None:
+            self.solver = Solver(self.engine)
+        return self.solver
 
-                    elif t.value == '0':
-                        self.recursive_reveal(t)
-
-                    else:
-                        t.reveal_tile()
+    def hint(self):
+        """
+        Highlights the next move suggested by the solver
+        :return: solver.Hint or None
+        """
+        if self.game_state != GameState.PLAYING:
+            return None
+        hint = self._get_solver().hint()
+        if hint is not None:
+            self.board.highlight(hint.x, hint.y)
+        return hint
+
+    def auto_play(self, guess=False) -> list:
+        """
+        Lets the solver play every move it can prove, or keep guessing if guess is set
+        :param guess: keep playing the safest guess when logic runs out [optional]
+        :return: list: solver.Hint of every move played
+        """
+        moves = []
+        while self.game_state == GameState.PLAYING:
+            move = self._get_solver().plan(guess)
+            if move is None:
+                break
+            if move.action == 'flag':
+                self.toggle_flag(move.x, move.y)
+            elif move.action == 'chord':
+                self.reveal_flagged(move.x, move.y)
+            else:
+                self.reveal_tile(move.x, move.y)
+            moves.append(move)
+        return moves
 
-    def recursive_reveal(self, tile) -> None:
+    def save_game(self, path=None) -> None:
         """
-        Recursively reveal blank tiles
-        :param tile: Reference to Tile object
+        Appends the current board and its moves to a game file
+        :param path: path of the game file, asked for with a dialog if not given [optional]
         :return: None
         """
+        if path is None:
+            path = filedialog.asksaveasfilename(
+                parent=self.root, defaultextension='.psw', filetypes=[("PySweeper games", "*.psw")]
+            )
+            if not path:
+                return
+        with GameWriter(path) as writer:
+            writer.write(GameRecord.from_engine(self.engine, self.seed))
+
+    def open_replay(self, path=None, index=-1, speed=1.0) -> None:
+        """
+        Plays back a game from a game file
+        :param path: path of the game file, asked for with a dialog if not given [optional]
+        :param index: index of the game in the file, the last one by default [optional]
+        :param speed: playback speed, 2.0 plays twice as fast as recorded [optional]
+        :return: None; files that cannot be played back are reported in a message box
+        """
+        if path is None:
+            path = filedialog.askopenfilename(parent=self.root, filetypes=[("PySweeper games", "*.psw")])
+            if not path:
+                return
+        try:
+            with GameFile(path) as games:
+                if not -len(games) <= index < len(games):
+                    raise ValueError(f"{path} holds {len(games)} games, there is no game {index}")
+                record = games[index]
+            self.play_replay(record, speed)
+        except (OSError, ValueError) as e:
+            # Raising inside a Tk callback would only print a traceback to the console
+            messagebox.showerror("Replay", f"Could not play back the game: {e}", parent=self.root)
+
+    def play_replay(self, record, speed=1.0) -> None:
+        """
+        Shows a recorded game on the board, playing its moves at their recorded pace
+        :param record: gamefile.GameRecord
+        :param speed: playback speed, 2.0 plays twice as fast as recorded [optional]
+        :return: None
+        """
+        if speed <= 0:
+            raise ValueError(f"playback speed must be positive, got {speed}")
 
-        tile.reveal_tile()
-        adjacent_tiles = self._get_adjacent_tiles(tile)
-        for node in adjacent_tiles:
-            if node.revealed:
-                continue
-
-            if int(node.value) > 0:
-                node.reveal_tile()
-
-            if int(node.value) == 0:
-                self.recursive_reveal(node)
+        self.stop_replay()
+        self.hotbar.timer.stop()
+        self.replay = Replay.from_record(record)
+        self.replay_speed = speed
+        self.cols, self.rows, self.mines = record.cols, record.rows, record.mines
+        self.minefield = self.replay.minefield
+        self.seed = record.seed
+        self.engine = self.replay.engine
+        self.solver = None
+        self.game_state = GameState.REPLAY
+        self.hotbar.update_mine_label(self.mines)
+        self.draw()
+        self._schedule_replay()
+
+    def _schedule_replay(self) -> None:
+        replay = self.replay
+        if replay.finished:
+            self.stop_replay()
+            return
+        last = replay.moves[replay.position - 1].time if replay.position else 0
+        delay = int((replay.moves[replay.position].time - last) / self.replay_speed)
+        self._replay_job = self.root.after(delay, self._replay_step)
+
+    def _replay_step(self) -> None:
+        self._replay_job = None
+        try:
+            changed = self.replay.step()
+        except ValueError as e:
+            # A move the engine rejects means the file does not match these rules; keep the board as far as it got
+            self.stop_replay()
+            messagebox.showerror("Replay", f"Playback stopped: {e}", parent=self.root)
+            return
+        self.scheduler.mark(changed)
+        self.hotbar.update_mine_label(self.engine.mines_left)
+        if self.engine.lost:
+            self.reveal_mines()
+        self._schedule_replay()
+
+    def stop_replay(self) -> None:
+        """
+        Stops a running playback, leaving the board as it is
+        :return: None
+        """
+        if self._replay_job is not None:
+            self.root.after_cancel(self._replay_job)
+            self._replay_job = None
+        if self.game_state == GameState.REPLAY:
+            self.game_state = GameState.IDLE
+            self.hotbar.update_button_image()
 
     def reveal_all(self) -> None:
-        for row in self.tilegrid:
-            for tile in row:
-                tile.reveal_tile()
+        self.scheduler.mark(self.engine.reveal_all())
         self.game_over()
 
     def game_over(self):
@@ -670,13 +1270,10 @@ class PySweeper:
         self.hotbar.update_button_image()
 
     def reveal_mines(self):
-        for row in self.tilegrid:
-            for tile in row:
-                if tile.value == 'X':
-                    tile.revealed = True
-                    tile._update_image()
+        self.scheduler.mark(self.engine.reveal_mines())
 
     def quit(self) -> None:
+        self.prefetcher.close()
         self.root.destroy()
 
     def about(self) -> None:
@@ -703,5 +1300,33 @@ class PySweeper:
 
 
 if __name__ == '__main__':
-    game = PySweeper(root)
+    parser = argparse.ArgumentParser(description="Minesweeper clone written in vanilla python")
+    parser.add_argument('--renderer', choices=RENDERERS, default='label', help="how the board is drawn")
+    parser.add_argument('--custom', nargs=3, type=int, metavar=('MINES', 'COLS', 'ROWS'), help="start a custom game")
+    parser.add_argument('--no-guess', action='store_true', help="only deal boards that need no guess")
+    parser.add_argument('--replay', metavar='FILE', help="play back a game from a game file")
+    parser.add_argument('--game', type=int, default=-1, help="index of the game to play back, default the last")
+    parser.add_argument('--speed', type=float, default=1.0, help="playback speed")
+    parser.add_argument('--profile', action='store_true', help="time every event and show the cost in the hotbar")
+    parser.add_argument('--trace', metavar='FILE', help="profile and write a Chrome trace file on exit")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    game = PySweeper(root, renderer=args.renderer)
+
+    profiler = None
+    if args.profile or args.trace:
+        from profiler import Profiler
+        profiler = Profiler()
+        profiler.attach(game)
+
+    if args.no_guess:
+        game.set_no_guess(True)
+    if args.custom:
+        game.custom_game(*args.custom)
+    if args.replay:
+        game.open_replay(args.replay, args.game, args.speed)
     game.root.mainloop()
+
+    if args.trace:
+        profiler.dump(args.trace)
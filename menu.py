@@ -13,8 +13,15 @@ class MenuBar(tk.Menu):
         file_menu.add_command(label='Beginner', command=lambda: self.on_difficulty_change('beginner'))
         file_menu.add_command(label='Intermediate', command=lambda: self.on_difficulty_change('intermediate'))
         file_menu.add_command(label='Expert', command=lambda: self.on_difficulty_change('expert'))
-        file_menu.add_command(label='Custom', command=lambda: self.on_difficulty_change('custom'))
+        file_menu.add_command(label='Custom...', command=self.custom_game)
+        self.no_guess = tk.BooleanVar(self, value=self.controller.no_guess)
+        file_menu.add_checkbutton(label='No Guessing', variable=self.no_guess, command=self.set_no_guess)
         file_menu.add_separator()
+        file_menu.add_command(label="Save Game...", command=self.save_game)
+        file_menu.add_command(label="Replay Game...", command=self.open_replay)
+        file_menu.add_separator()
+        file_menu.add_command(label="Hint", command=self.hint)
+        file_menu.add_command(label="Auto Play", command=self.auto_play)
         file_menu.add_command(label="Reveal All", command=self.reveal_all)
         file_menu.add_separator()
         file_menu.add_command(label='Exit', command=self.quit)
@@ -34,6 +41,24 @@ class MenuBar(tk.Menu):
             print(e)
             return
 
+    def custom_game(self):
+        self.controller.custom_game()
+
+    def set_no_guess(self):
+        self.controller.set_no_guess(self.no_guess.get())
+
+    def save_game(self):
+        self.controller.save_game()
+
+    def open_replay(self):
+        self.controller.open_replay()
+
+    def hint(self):
+        self.controller.hint()
+
+    def auto_play(self):
+        self.controller.auto_play()
+
     def reveal_all(self):
         self.controller.reveal_all()
 
@@ -0,0 +1,186 @@
+from array import array
+from collections import namedtuple
+import numpy as np
+from minefield import MINE, generate_minefield_array
+
+#################
+# -- GLOBALS -- #
+#################
+
+BoardMetrics = namedtuple("BoardMetrics", "three_bv openings opening_sizes isolated")
+
+BatchMetrics = namedtuple("BatchMetrics", "three_bv openings isolated")
+
+# Openings in CSR form, like neighbors.NeighborTable: labels[i] is the opening id of blank tile i (-1 elsewhere),
+# and members[offsets[k]:offsets[k + 1]] are the flat indices (y * cols + x) of every tile opening k reveals,
+# its blanks[k] blank tiles first and its numbered border after them
+OpeningIndex = namedtuple("OpeningIndex", "cols labels offsets members blanks")
+
+# Candidates generate_by_3bv scores before giving up on a 3BV range
+MAX_CANDIDATES = 100000
+
+
+########################
+# --STATIC FUNCTIONS-- #
+########################
+
+
+def opening_index(minefield) -> OpeningIndex:
+    """
+    Labels every opening (a connected region of blank tiles) in one linear pass
+    and lists the tiles each one reveals, its blanks plus their numbered border
+    :param minefield: 2D list of string values from generate_minefield
+    :return: OpeningIndex
+    """
+    rows, cols = len(minefield), len(minefield[0])
+    values = [value for row in minefield for value in row]
+    labels = [-1] * (rows * cols)
+    offsets = array('i', [0])
+    members = array('i')
+    blanks = array('i')
+
+    for start, value in enumerate(values):
+        if value != '0' or labels[start] != -1:
+            continue
+
+        label = len(offsets) - 1
+        labels[start] = label
+        border = set()
+        stack = [start]
+        while stack:
+            index = stack.pop()
+            members.append(index)
+            y, x = divmod(index, cols)
+            for adj_y in range(max(0, y - 1), min(rows, y + 2)):
+                for adj_x in range(max(0, x - 1), min(cols, x + 2)):
+                    adj = adj_y * cols + adj_x
+                    if values[adj] != '0':
+                        border.add(adj)
+                    elif labels[adj] == -1:
+                        labels[adj] = label
+                        stack.append(adj)
+        blanks.append(len(members) - offsets[label])
+        members.extend(border)
+        offsets.append(len(members))
+
+    return OpeningIndex(cols, labels, offsets, members, blanks)
+
+
+def label_openings(minefield) -> tuple:
+    """
+    Labels every opening (a connected region of blank tiles) in one linear pass
+    :param minefield: 2D list of string values from generate_minefield
+    :return: (labels, sizes): flat list holding the opening id of every blank tile (-1 elsewhere),
+    and the number of tiles each opening reveals, its blanks plus their numbered border
+    """
+    index = opening_index(minefield)
+    offsets = index.offsets
+    return index.labels, [offsets[k + 1] - offsets[k] for k in range(len(offsets) - 1)]
+
+
+def board_metrics(minefield) -> BoardMetrics:
+    """
+    Computes the difficulty metrics of a single board
+    :param minefield: 2D list of string values from generate_minefield
+    :return: BoardMetrics: 3BV (minimum clicks to clear), number of openings, tiles revealed by each opening,
+    and numbered tiles not bordering any opening
+    """
+    rows, cols = len(minefield), len(minefield[0])
+    labels, sizes = label_openings(minefield)
+
+    isolated = 0
+    for y, row in enumerate(minefield):
+        for x, value in enumerate(row):
+            if value in ('0', 'X'):
+                continue
+            if all(
+                    labels[adj_y * cols + adj_x] == -1
+                    for adj_y in range(max(0, y - 1), min(rows, y + 2))
+                    for adj_x in range(max(0, x - 1), min(cols, x + 2))
+            ):
+                isolated += 1
+
+    return BoardMetrics(len(sizes) + isolated, len(sizes), sizes, isolated)
+
+
+def _neighborhood(mask, reduce) -> np.ndarray:
+    """
+    Combines every cell of a stack of boards with its 8 neighbors
+    :param mask: (boards, rows, cols) array
+    :param reduce: np.maximum or np.logical_or
+    :return: np.ndarray of the same shape
+    """
+    boards, rows, cols = mask.shape
+    padded = np.pad(mask, ((0, 0), (1, 1), (1, 1)))
+    result = mask.copy()
+    for i in range(3):
+        for j in range(3):
+            if i == 1 and j == 1:
+                continue
+            result = reduce(result, padded[:, i:i + rows, j:j + cols])
+    return result
+
+
+def batch_metrics(fields) -> BatchMetrics:
+    """
+    Scores a stack of same-sized boards at once with array operations
+    :param fields: (boards, rows, cols) int8 array of minefields from generate_minefield_array
+    :return: BatchMetrics of per-board int arrays
+    """
+    fields = np.asarray(fields)
+    if fields.ndim == 2:
+        fields = fields[np.newaxis]
+    boards, rows, cols = fields.shape
+
+    blank = fields == 0
+    near_blank = _neighborhood(blank, np.logical_or)
+    isolated = (~near_blank & (fields != MINE)).reshape(boards, -1).sum(axis=1)
+
+    # Spread the largest cell id through every opening until it stops changing; each opening
+    # then has exactly one cell still holding its own id
+    ids = np.arange(1, rows * cols + 1, dtype=np.int32).reshape(1, rows, cols)
+    labels = np.where(blank, ids, 0)
+    while True:
+        spread = np.where(blank, _neighborhood(labels, np.maximum), 0)
+        if np.array_equal(spread, labels):
+            break
+        labels = spread
+    openings = (blank & (labels == ids)).reshape(boards, -1).sum(axis=1)
+
+    return BatchMetrics(openings + isolated, openings, isolated)
+
+
+def generate_by_3bv(mines, cols, rows, low=0, high=None, count=1, seed=0, batch=256,
+                    max_candidates=MAX_CANDIDATES) -> list:
+    """
+    Generates boards whose 3BV falls in [low, high], scoring candidates in batches
+    :param mines: number of mines
+    :param cols: number of cols
+    :param rows: number of rows
+    :param low: smallest accepted 3BV [optional]
+    :param high: largest accepted 3BV, None for no limit [optional]
+    :param count: number of boards to return [optional]
+    :param seed: seed of the first candidate; candidate i uses seed + i [optional]
+    :param batch: candidates scored per batch [optional]
+    :param max_candidates: candidates scored before giving up [optional]
+    :return: list: (seed, int8 minefield array) of the accepted boards
+    """
+    if high is not None and high < low:
+        raise ValueError(f"empty 3BV range [{low}, {high}]")
+
+    accepted = []
+    end = seed + max_candidates
+    while len(accepted) < count:
+        if seed >= end:
+            raise ValueError(f"only {len(accepted)} of {count} boards with a 3BV in [{low}, {high}] found "
+                             f"in {max_candidates} candidates of {mines} mines on {cols}x{rows}")
+        seeds = range(seed, min(seed + batch, end))
+        fields = np.stack([generate_minefield_array(mines, cols, rows, s) for s in seeds])
+        scores = batch_metrics(fields).three_bv
+        keep = scores >= low
+        if high is not None:
+            keep &= scores <= high
+        for i in np.flatnonzero(keep)[:count - len(accepted)]:
+            accepted.append((seeds[i], fields[i]))
+        seed += len(seeds)
+    return accepted
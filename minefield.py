@@ -0,0 +1,151 @@
+import random
+from collections import namedtuple
+import numpy as np
+
+#################
+# -- GLOBALS -- #
+#################
+
+Difficulty = namedtuple("Difficulty", "mines cols rows")
+
+difficulty_dict = {
+    'beginner': Difficulty(10, 9, 9),
+    'intermediate': Difficulty(40, 15, 15),
+    'expert': Difficulty(99, 30, 16)
+}
+
+MINE = -1
+
+# Indexing with a cell value maps 0-8 to its digit and MINE (-1) to the last entry
+SYMBOLS = np.array([str(n) for n in range(9)] + ["X"])
+
+
+########################
+# --STATIC FUNCTIONS-- #
+########################
+
+
+def exclusion_zone(x, y, cols, rows, radius=1) -> list:
+    """
+    Returns the sorted flat indices of the cells within radius of (x, y), clipped to the board
+    :param x: index of column
+    :param y: index of row
+    :param cols: number of cols
+    :param rows: number of rows
+    :param radius: distance from (x, y) to exclude [optional]
+    :return: list
+    """
+    return [
+        zone_y * cols + zone_x
+        for zone_y in range(max(0, y - radius), min(rows, y + radius + 1))
+        for zone_x in range(max(0, x - radius), min(cols, x + radius + 1))
+    ]
+
+
+def place_mines(mines, cols, rows, seed=None, safe=None) -> list:
+    """
+    Draws exactly `mines` distinct cells uniformly at random using Floyd's algorithm.
+    Costs O(mines) random draws regardless of board size.
+    :param mines: number of mines
+    :param cols: number of cols
+    :param rows: number of rows
+    :param seed: seed for a per-board random.Random, None for OS entropy [optional]
+    :param safe: (x, y) of the first click; it and its 8 neighbors never get a mine [optional]
+    :return: list: sorted flat indices (y * cols + x) of the mines
+    """
+    excluded = exclusion_zone(*safe, cols, rows) if safe is not None else []
+    available = cols * rows - len(excluded)
+    if not 0 <= mines <= available:
+        raise ValueError(f"cannot place {mines} mines on a {cols}x{rows} board")
+
+    rand = random.Random(seed)
+    chosen = set()
+    for upper in range(available - mines, available):
+        pick = rand.randint(0, upper)
+        chosen.add(upper if pick in chosen else pick)
+
+    if not excluded:
+        return sorted(chosen)
+
+    # Map ranks among the available cells back to board indices by skipping the excluded ones
+    positions = []
+    for rank in sorted(chosen):
+        index = rank
+        for cell in excluded:
+            if cell > index:
+                break
+            index += 1
+        positions.append(index)
+    return positions
+
+
+def count_adjacent(mine_mask) -> np.ndarray:
+    """
+    Counts the mines on the 8 adjacent neighbors of every cell with a single shift-sum
+    :param mine_mask: 2D boolean array, True where a mine is placed
+    :return: np.ndarray: 2D int8 array of neighbor counts (0-8)
+    """
+    rows, cols = mine_mask.shape
+    padded = np.pad(mine_mask.astype(np.int8), 1)
+    counts = np.zeros((rows, cols), dtype=np.int8)
+    for i in range(3):
+        for j in range(3):
+            if i == 1 and j == 1:
+                continue
+            counts += padded[i:i + rows, j:j + cols]
+    return counts
+
+
+def generate_minefield_array(mines, cols, rows, seed=None, safe=None) -> np.ndarray:
+    """
+    Generates a dense 2D int8 array representing the state of every tile.
+    A number (0-8) denotes the total number of mines found on it's 8 adjacent neighbors
+    MINE (-1) denotes a mine
+    :param mines: number of mines
+    :param cols: number of cols
+    :param rows: number of rows
+    :param seed: seed for reproducible mine placement [optional]
+    :param safe: (x, y) of the first click, kept clear of mines [optional]
+    :return: np.ndarray
+    """
+    mine_mask = np.zeros(cols * rows, dtype=bool)
+    mine_mask[place_mines(mines, cols, rows, seed, safe)] = True
+    mine_mask = mine_mask.reshape(rows, cols)
+
+    field = count_adjacent(mine_mask)
+    field[mine_mask] = MINE
+    return field
+
+
+def array_to_minefield(field) -> list:
+    """
+    Converts a dense int8 minefield into the 2D list of strings used by the game
+    :param field: 2D int8 array from generate_minefield_array
+    :return: list
+    """
+    return SYMBOLS[field].tolist()
+
+
+def minefield_to_array(minefield) -> np.ndarray:
+    """
+    Converts a 2D list of strings back into a dense int8 minefield
+    :param minefield: 2D list of "X" / "0"-"8" strings
+    :return: np.ndarray
+    """
+    field = np.array(minefield)
+    return np.where(field == "X", str(MINE), field).astype(np.int8)
+
+
+def generate_minefield(mines, cols, rows, seed=None, safe=None) -> list:
+    """
+    Generates a 2D list of string value representing the state of a tile.
+    A number (0-8) denotes the total number of mines found on it's 8 adjacent neighbors
+    An 'x' denotes a mine
+    :param mines: number of mines
+    :param cols: number of cols
+    :param rows: number of rows
+    :param seed: seed for reproducible mine placement [optional]
+    :param safe: (x, y) of a tile that must not hold or touch a mine [optional]
+    :return: list
+    """
+    return array_to_minefield(generate_minefield_array(mines, cols, rows, seed, safe))
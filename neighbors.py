@@ -0,0 +1,65 @@
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+
+#################
+# -- GLOBALS -- #
+#################
+
+NeighborTable = namedtuple("NeighborTable", "rows cols offsets indices adjacent")
+
+# Boards up to this size also hold a tuple of (x, y) per tile, the fastest form to iterate;
+# at this size they take about 3 MB and 0.05 s to build. The CSR arrays take about 36 bytes per tile at any size
+MAX_TABLE_CELLS = 128 * 128
+
+# Row and column steps to the 8 neighbors, in the order they are listed
+STEPS = tuple((dy, dx) for dy in range(-1, 2) for dx in range(-1, 2) if dy or dx)
+
+
+########################
+# --STATIC FUNCTIONS-- #
+########################
+
+
+@lru_cache(maxsize=4)
+def neighbor_table(rows, cols) -> NeighborTable:
+    """
+    Builds the neighbor table of a board size once and caches it by (rows, cols).
+    offsets/indices form a CSR pair: the flat indices (y * cols + x) of the neighbors of cell i are
+    indices[offsets[i]:offsets[i + 1]]. adjacent[i] holds the same neighbors as a tuple of (x, y),
+    for boards up to MAX_TABLE_CELLS only.
+    :param rows: number of rows
+    :param cols: number of cols
+    :return: NeighborTable
+    """
+    y, x = np.divmod(np.arange(rows * cols, dtype=np.int32), cols)
+    # One column per step, -1 where the neighbor is off the board; row-major order keeps each cell's neighbors together
+    grid = np.full((rows * cols, len(STEPS)), -1, dtype=np.int32)
+    for step, (dy, dx) in enumerate(STEPS):
+        inside = (y + dy >= 0) & (y + dy < rows) & (x + dx >= 0) & (x + dx < cols)
+        grid[inside, step] = (y[inside] + dy) * cols + x[inside] + dx
+
+    inside = grid >= 0
+    offsets = array('i', [0])
+    offsets.frombytes(np.cumsum(inside.sum(axis=1), dtype=np.int32).tobytes())
+    indices = array('i', grid[inside].tobytes())
+
+    adjacent = None
+    if rows * cols <= MAX_TABLE_CELLS:
+        cells = [(cell % cols, cell // cols) for cell in range(rows * cols)]
+        adjacent = [
+            tuple(cells[i] for i in indices[offsets[cell]:offsets[cell + 1]]) for cell in range(rows * cols)
+        ]
+
+    return NeighborTable(rows, cols, offsets, indices, adjacent)
+
+
+def neighbor_indices(table, index) -> array:
+    """
+    Returns the flat indices of the neighbors of a cell
+    :param table: NeighborTable
+    :param index: flat index of the cell
+    :return: array
+    """
+    return table.indices[table.offsets[index]:table.offsets[index + 1]]
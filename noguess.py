@@ -0,0 +1,148 @@
+import multiprocessing
+import random
+from collections import deque
+from engine import GameEngine
+from minefield import generate_minefield
+from solver import Solver
+
+#################
+# -- GLOBALS -- #
+#################
+
+# Candidates tested per task sent to a worker
+CHUNK = 8
+
+# Candidates tested before giving up; about 12% of expert boards need no guess from the centre
+MAX_CANDIDATES = 10000
+
+
+########################
+# --STATIC FUNCTIONS-- #
+########################
+
+
+def default_start(cols, rows) -> tuple:
+    return cols // 2, rows // 2
+
+
+def is_no_guess(minefield, start) -> bool:
+    """
+    Checks whether a board can be cleared by logic alone from its first click.
+    Known safe tiles are revealed in batches between propagation passes, and the exact
+    mine probabilities are only computed when propagation runs dry; the check stops at the first guess.
+    :param minefield: 2D list of string values
+    :param start: (x, y) of the first click
+    :return: bool
+    """
+    engine = GameEngine(minefield)
+    solver = Solver(engine)
+    engine.reveal(*start)
+    while engine.playing:
+        solver.propagate()
+        safe = solver.safe
+        if not any(not engine.is_revealed(*tile) for tile in safe):
+            safe = [tile for tile, probability in solver.probabilities().items() if probability == 0.0]
+        safe = [tile for tile in safe if not engine.is_revealed(*tile)]
+        if not safe:
+            return False
+        for tile in safe:
+            engine.reveal(*tile)
+    return engine.won
+
+
+def search(task):
+    """
+    Tests consecutive seeds until one gives a no-guess board
+    :param task: (mines, cols, rows, start, first seed, number of seeds)
+    :return: int: the first passing seed, or None
+    """
+    mines, cols, rows, start, first, count = task
+    for seed in range(first, first + count):
+        if is_no_guess(generate_minefield(mines, cols, rows, seed=seed, safe=start), start):
+            return seed
+    return None
+
+
+def generate_no_guess(mines, cols, rows, seed=None, start=None, max_candidates=MAX_CANDIDATES) -> tuple:
+    """
+    Generates a board that needs no guess from its first click, testing candidates in this process.
+    Candidate i uses seed + i, so the result only depends on the seed.
+    :param mines: number of mines
+    :param cols: number of cols
+    :param rows: number of rows
+    :param seed: seed of the first candidate, random if None [optional]
+    :param start: (x, y) of the first click, the centre by default [optional]
+    :param max_candidates: candidates tested before giving up [optional]
+    :return: (seed, 2D list of string values); the board is generate_minefield(..., seed=seed, safe=start)
+    """
+    start = start or default_start(cols, rows)
+    first = random.randrange(2 ** 62) if seed is None else seed
+    found = search((mines, cols, rows, start, first, max_candidates))
+    if found is None:
+        raise ValueError(f"no no-guess board found in {max_candidates} candidates of {mines} mines on {cols}x{rows}")
+    return found, generate_minefield(mines, cols, rows, seed=found, safe=start)
+
+
+###############
+# --CLASSES-- #
+###############
+
+
+class NoGuessGenerator:
+    """
+    Searches no-guess boards across a process pool that is kept between boards.
+    Candidates are handed out in chunks of consecutive seeds, with only a few chunks in flight,
+    and the first passing seed in seed order wins, so the result does not depend on the number of workers.
+    """
+
+    def __init__(self, workers=None):
+        """
+        Init method of NoGuessGenerator class
+        :param workers: number of processes, None for one per CPU, 1 to search in this process [optional]
+        """
+        self.workers = workers or multiprocessing.cpu_count()
+        self.pool = None
+        if self.workers > 1:
+            # spawn: safe to start from a program that already runs threads or Tk
+            self.pool = multiprocessing.get_context('spawn').Pool(self.workers)
+
+    def generate(self, mines, cols, rows, seed=None, start=None, max_candidates=MAX_CANDIDATES) -> tuple:
+        """
+        Generates a board that needs no guess from its first click
+        :param mines: number of mines
+        :param cols: number of cols
+        :param rows: number of rows
+        :param seed: seed of the first candidate, random if None [optional]
+        :param start: (x, y) of the first click, the centre by default [optional]
+        :param max_candidates: candidates tested before giving up [optional]
+        :return: (seed, 2D list of string values) as from generate_no_guess
+        """
+        if self.pool is None:
+            return generate_no_guess(mines, cols, rows, seed, start, max_candidates)
+
+        start = start or default_start(cols, rows)
+        first = random.randrange(2 ** 62) if seed is None else seed
+        end = first + max_candidates
+
+        pending = deque()
+        next_seed = first
+        while pending or next_seed < end:
+            while len(pending) < self.workers * 2 and next_seed < end:
+                count = min(CHUNK, end - next_seed)
+                pending.append(self.pool.apply_async(search, ((mines, cols, rows, start, next_seed, count),)))
+                next_seed += count
+            found = pending.popleft().get()
+            if found is not None:
+                # Chunks still in flight finish on their own; their results are dropped
+                return found, generate_minefield(mines, cols, rows, seed=found, safe=start)
+        raise ValueError(f"no no-guess board found in {max_candidates} candidates of {mines} mines on {cols}x{rows}")
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,142 @@
+import random
+import threading
+from collections import deque
+from engine import board_openings
+from minefield import generate_minefield
+from neighbors import neighbor_table
+from noguess import MAX_CANDIDATES, NoGuessGenerator
+
+#################
+# -- GLOBALS -- #
+#################
+
+# Candidates a no-guess board is searched from when take() has to wait for one; about 2s on a single CPU,
+# and enough for the standard difficulties to practically always find one
+TAKE_CANDIDATES = 200
+
+
+###############
+# --CLASSES-- #
+###############
+
+
+class BoardPrefetcher:
+    """
+    Keeps a few boards of the current difficulty ready, generated on a background thread,
+    so starting a game takes a board instead of generating one on the Tk main thread.
+    The opening index of every board, and the neighbor table of its size, are built on the same thread.
+    No-guess boards come from a noguess.NoGuessGenerator, started the first time one is asked for.
+    A no-guess board that is not ready yet is searched with a small budget, so a size that has none
+    fails quickly in take() instead of blocking the caller.
+    """
+
+    def __init__(self, depth=2):
+        """
+        Init method of BoardPrefetcher class
+        :param depth: number of boards kept ready [optional]
+        """
+        if depth < 1:
+            raise ValueError(f"prefetch depth must be positive, got {depth}")
+
+        self.depth = depth
+        self.level = None
+        self.no_guess = False
+        self.generator = None
+        self.ready = deque()
+        # take() is searching a board itself; the worker waits for it rather than search the same size alongside
+        self._taking = False
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="board-prefetch", daemon=True)
+        self._thread.start()
+
+    def generate(self, level, no_guess=False, max_candidates=MAX_CANDIDATES) -> tuple:
+        """
+        Generates a board from a fresh seed
+        :param level: minefield.Difficulty
+        :param no_guess: only return a board that needs no guess from its centre tile [optional]
+        :param max_candidates: candidates tested before giving up on a no-guess board [optional]
+        :return: (seed, 2D list of string values, engine.board_openings of the board)
+        """
+        if no_guess:
+            with self._condition:
+                if self.generator is None:
+                    self.generator = NoGuessGenerator()
+            seed, minefield = self.generator.generate(level.mines, level.cols, level.rows,
+                                                      max_candidates=max_candidates)
+        else:
+            seed = random.randrange(2 ** 63)
+            minefield = generate_minefield(level.mines, level.cols, level.rows, seed=seed)
+        # Cached by size, so the engine built on the Tk thread finds it ready
+        neighbor_table(level.rows, level.cols)
+        return seed, minefield, board_openings(minefield)
+
+    def take(self, level, no_guess=False) -> tuple:
+        """
+        Returns a ready board of a difficulty, or generates one here if none is ready yet.
+        Switching to another difficulty or no-guess setting drops the boards of the previous one.
+        :param level: minefield.Difficulty
+        :param no_guess: only return a board that needs no guess from its centre tile [optional]
+        :return: (seed, 2D list of string values, engine.board_openings of the board)
+        :raises ValueError: if no no-guess board was found in TAKE_CANDIDATES candidates
+        """
+        with self._condition:
+            if (level, no_guess) != (self.level, self.no_guess):
+                self.level = level
+                self.no_guess = no_guess
+                self.ready.clear()
+            board = self.ready.popleft() if self.ready else None
+            self._taking = board is None and no_guess
+            # Wake the worker to refill the queue
+            self._condition.notify()
+        if board is None and not no_guess:
+            board = self.generate(level)
+        elif board is None:
+            try:
+                board = self.generate(level, no_guess, TAKE_CANDIDATES)
+            except ValueError:
+                with self._condition:
+                    # Leave the worker idle rather than search the same size again
+                    if (level, no_guess) == (self.level, self.no_guess):
+                        self.level = None
+                raise
+            finally:
+                with self._condition:
+                    self._taking = False
+                    self._condition.notify()
+        return board
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed and (self.level is None or self._taking or len(self.ready) >= self.depth):
+                    self._condition.wait()
+                if self._closed:
+                    return
+                level, no_guess = self.level, self.no_guess
+
+            try:
+                board = self.generate(level, no_guess)
+            except ValueError:
+                # No no-guess board of this size was found; take() reports it when asked for one
+                with self._condition:
+                    if (level, no_guess) == (self.level, self.no_guess):
+                        self._condition.wait()
+                continue
+
+            with self._condition:
+                # The difficulty may have changed while generating
+                if (level, no_guess) == (self.level, self.no_guess) and len(self.ready) < self.depth:
+                    self.ready.append(board)
+
+    def close(self) -> None:
+        """
+        Stops the worker thread and drops the ready boards
+        :return: None
+        """
+        with self._condition:
+            self._closed = True
+            self.ready.clear()
+            self._condition.notify()
+            if self.generator is not None:
+                self.generator.close()
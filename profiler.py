@@ -0,0 +1,194 @@
+import json
+import time
+import tkinter as tk
+from collections import namedtuple
+from contextlib import contextmanager
+
+#################
+# -- GLOBALS -- #
+#################
+
+# A timed section; start and duration are in seconds, depth is 0 for a user event
+Span = namedtuple("Span", "name start duration depth info")
+
+OVERLAY_FONT = ("Arial", 8)
+
+
+###############
+# --CLASSES-- #
+###############
+
+
+class Profiler:
+    """
+    Records how long each user event spends in the engine, the board redraw, the hotbar and Tk layout.
+    attach() replaces methods of one running game with timed wrappers, so a game that
+    was never attached runs exactly the same code as before.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.depth = 0
+        self.game = None
+        self.overlay = None
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name, **info):
+        """
+        Times a block of code
+        :param name: name of the span
+        :param info: details stored with the span; the block may add more to the yielded dict
+        :return: context manager yielding the info dict
+        """
+        start = time.perf_counter()
+        self.depth += 1
+        try:
+            yield info
+        finally:
+            self.depth -= 1
+            self.spans.append(Span(name, start - self._origin, time.perf_counter() - start, self.depth, info))
+
+    def _wrap(self, owner, method, name, describe=None) -> None:
+        """
+        Replaces a bound method of one object with a timed wrapper
+        :param owner: object holding the method
+        :param method: name of the method
+        :param name: name of the span
+        :param describe: callable (result, args) -> dict of details to store [optional]
+        :return: None
+        """
+        original = getattr(owner, method)
+        if getattr(original, 'profiled', False):
+            return
+
+        def wrapper(*args, **kwargs):
+            with self.span(name) as info:
+                result = original(*args, **kwargs)
+                if describe is not None:
+                    info.update(describe(result, args))
+            return result
+
+        wrapper.profiled = True
+        setattr(owner, method, wrapper)
+
+    def _wrap_event(self, method) -> None:
+        """
+        Wraps a controller method that handles a user event; once it returns, pending Tk layout
+        is flushed and timed too, and the overlay shows the cost of the whole event
+        :param method: name of the PySweeper method
+        :return: None
+        """
+        game = self.game
+        original = getattr(game, method)
+
+        def wrapper(*args, **kwargs):
+            if self.depth:
+                return original(*args, **kwargs)
+            first = len(self.spans)
+            with self.span(method, x=args[0], y=args[1]) if len(args) >= 2 else self.span(method):
+                result = original(*args, **kwargs)
+            with self.span('layout'):
+                game.root.update_idletasks()
+            self.update_overlay(self.spans[first:])
+            return result
+
+        wrapper.profiled = True
+        setattr(game, method, wrapper)
+
+    def _wrap_engine(self) -> None:
+        engine = self.game.engine
+        tiles = lambda result, args: {'tiles': len(result)}
+        self._wrap(engine, 'reveal', 'engine.reveal', tiles)
+        self._wrap(engine, 'chord', 'engine.chord', tiles)
+        self._wrap(engine, 'toggle_flag', 'engine.toggle_flag')
+
+    def _wrap_board(self) -> None:
+        self._wrap(self.game.board, 'redraw', 'board.redraw', lambda result, args: {'widgets': len(args[0])})
+
+    def _follow(self, method, rewrap) -> None:
+        """
+        Re-instruments the parts of the game that a controller method replaces
+        :param method: name of the PySweeper method
+        :param rewrap: callable wrapping the new objects
+        :return: None
+        """
+        game = self.game
+        original = getattr(game, method)
+
+        def wrapper(*args, **kwargs):
+            result = original(*args, **kwargs)
+            rewrap()
+            return result
+
+        setattr(game, method, wrapper)
+
+    def attach(self, game) -> None:
+        """
+        Instruments a running game and adds the overlay to its hotbar
+        :param game: main.PySweeper
+        :return: None
+        """
+        self.game = game
+        for method in ('reveal_tile', 'reveal_flagged', 'toggle_flag', 'hint', 'auto_play', 'reveal_all'):
+            self._wrap_event(method)
+        self._wrap(game.hotbar, 'update_mine_label', 'hotbar.update_mine_label')
+        self._wrap_engine()
+        self._wrap_board()
+        self._follow('on_difficulty_change', self._wrap_engine)
+        self._follow('play_replay', self._wrap_engine)
+        self._follow('_add_board', self._wrap_board)
+
+        self.overlay = tk.Label(game.hotbar.frame, font=OVERLAY_FONT, justify=tk.LEFT, text="profiling")
+        self.overlay.pack(padx=(0, 5), side=tk.RIGHT)
+
+    def update_overlay(self, spans) -> None:
+        """
+        Shows the cost of a user event in the hotbar
+        :param spans: spans recorded during the event and the layout flush after it
+        :return: None
+        """
+        frame = sum(span.duration for span in spans if span.depth == 0)
+        engine = sum(span.duration for span in spans if span.name.startswith('engine.'))
+        tiles = sum(span.info.get('tiles', 0) for span in spans)
+        widgets = sum(span.info.get('widgets', 0) for span in spans)
+        self.overlay.config(text=(
+            f"frame {frame * 1000:.1f} ms  engine {engine * 1000:.1f} ms\n"
+            f"tiles {tiles}  widgets {widgets}"
+        ))
+
+    def summary(self) -> dict:
+        """
+        Aggregates the recorded spans by name
+        :return: dict: name -> count, total, mean and max duration in seconds
+        """
+        summary = {}
+        for span in self.spans:
+            entry = summary.setdefault(span.name, {'count': 0, 'total': 0.0, 'max': 0.0})
+            entry['count'] += 1
+            entry['total'] += span.duration
+            entry['max'] = max(entry['max'], span.duration)
+        for entry in summary.values():
+            entry['mean'] = entry['total'] / entry['count']
+        return summary
+
+    def dump(self, path) -> None:
+        """
+        Writes the recorded spans in the Chrome trace event format, readable by chrome://tracing and Perfetto
+        :param path: path of the trace file
+        :return: None
+        """
+        events = [
+            {
+                'name': span.name,
+                'ph': 'X',
+                'ts': span.start * 1e6,
+                'dur': span.duration * 1e6,
+                'pid': 0,
+                'tid': 0,
+                'args': span.info,
+            }
+            for span in sorted(self.spans, key=lambda span: (span.start, span.depth))
+        ]
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'summary': self.summary()}, file)
@@ -0,0 +1,192 @@
+import argparse
+import copy
+import json
+import sys
+import time
+from collections import namedtuple
+from engine import GameEngine
+from gamefile import GameFile
+
+#################
+# -- GLOBALS -- #
+#################
+
+# State of a replay after `index` moves
+Snapshot = namedtuple("Snapshot", "index tracker state")
+
+SNAPSHOT_INTERVAL = 64
+
+
+########################
+# --STATIC FUNCTIONS-- #
+########################
+
+
+def replay_file(path, indices=None):
+    """
+    Replays the games of a game file one after the other
+    :param path: path of the game file
+    :param indices: indices of the games to replay, all if None [optional]
+    :return: generator of dict: per-game result
+    """
+    with GameFile(path) as games:
+        for index in range(len(games)) if indices is None else indices:
+            record = games[index]
+            result = {'index': index, 'seed': record.seed, 'moves': len(record.moves), 'error': None}
+            replay = Replay.from_record(record)
+            try:
+                engine = replay.run()
+            except ValueError as e:
+                engine = replay.engine
+                result['error'] = str(e)
+            result['played'] = replay.position
+            result['state'] = engine.state.name.lower()
+            yield result
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded PySweeper games through the game rules")
+    parser.add_argument('path', help="game file written by gamefile.GameWriter")
+    parser.add_argument('--index', type=int, nargs='+', help="replay only these games")
+    parser.add_argument('--results', action='store_true', help="print one JSON line per game")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    summary = {'games': 0, 'moves': 0, 'won': 0, 'lost': 0, 'playing': 0, 'rejected': []}
+    for result in replay_file(args.path, args.index):
+        if args.results:
+            sys.stdout.write(json.dumps(result) + "\n")
+        summary['games'] += 1
+        summary['moves'] += result['played']
+        summary[result['state']] += 1
+        if result['error'] is not None:
+            summary['rejected'].append(result['index'])
+
+    elapsed = time.perf_counter() - start
+    summary['elapsed'] = elapsed
+    summary['moves_per_second'] = summary['moves'] / elapsed if elapsed else 0.0
+    out = sys.stderr if args.results else sys.stdout
+    out.write(json.dumps(summary, indent=2) + "\n")
+
+
+###############
+# --CLASSES-- #
+###############
+
+
+class Replay:
+    """
+    Plays recorded moves back through a GameEngine at full speed.
+    A copy of the board state is kept every `interval` moves, so seeking replays at most `interval` moves.
+    """
+
+    def __init__(self, minefield, moves, interval=SNAPSHOT_INTERVAL):
+        """
+        Init method of Replay class
+        :param minefield: 2D list of string values from generate_minefield
+        :param moves: list of engine.Move
+        :param interval: moves between snapshots [optional]
+        """
+        if interval < 1:
+            raise ValueError(f"snapshot interval must be positive, got {interval}")
+
+        self.minefield = minefield
+        self.moves = list(moves)
+        self.interval = interval
+        self.engine = GameEngine(minefield)
+        self.position = 0
+        self.snapshots = [self._snapshot()]
+
+    @classmethod
+    def from_record(cls, record, interval=SNAPSHOT_INTERVAL):
+        """
+        Builds a replay of a recorded game
+        :param record: gamefile.GameRecord
+        :param interval: moves between snapshots [optional]
+        :return: Replay
+        """
+        return cls(record.minefield(), record.moves, interval)
+
+    def __len__(self):
+        return len(self.moves)
+
+    @property
+    def finished(self) -> bool:
+        return self.position == len(self.moves)
+
+    def _snapshot(self) -> Snapshot:
+        # The minefield never changes, so every snapshot shares it
+        tracker = copy.deepcopy(self.engine.tracker, {id(self.minefield): self.minefield})
+        return Snapshot(self.position, tracker, self.engine.state)
+
+    def _restore(self, snapshot) -> None:
+        """
+        Replaces the engine with one in the state of a snapshot
+        :param snapshot: Snapshot
+        :return: None
+        """
+        tracker = copy.deepcopy(snapshot.tracker, {id(self.minefield): self.minefield})
+        engine = GameEngine(self.minefield, storage=tracker, openings=self.engine.openings)
+        engine.state = snapshot.state
+        engine.history = self.moves[:snapshot.index]
+        self.engine = engine
+        self.position = snapshot.index
+
+    def step(self) -> set:
+        """
+        Plays the next recorded move
+        :return: set: (x, y) of every tile changed by the move
+        """
+        if self.finished:
+            raise ValueError("no moves left to replay")
+
+        move = self.moves[self.position]
+        engine = self.engine
+        before = len(engine.history)
+        if move.action == 'reveal':
+            changed = engine.reveal(move.x, move.y)
+        elif move.action == 'flag':
+            changed = {(move.x, move.y)} if engine.toggle_flag(move.x, move.y) else set()
+        elif move.action == 'chord':
+            changed = engine.chord(move.x, move.y)
+        else:
+            raise ValueError(f"unknown action {move.action!r} at move {self.position}")
+
+        if len(engine.history) == before:
+            raise ValueError(f"move {self.position} {move} was rejected by the engine")
+        # Keep the recorded timestamp instead of the replay's own clock
+        engine.history[-1] = move
+
+        self.position += 1
+        if self.position == len(self.snapshots) * self.interval:
+            self.snapshots.append(self._snapshot())
+        return changed
+
+    def seek(self, index) -> None:
+        """
+        Brings the replay to the state after `index` moves, starting from the nearest snapshot
+        when it is closer than the current position.
+        Seeking back may replace `engine` with a new GameEngine.
+        :param index: number of moves played, 0 to len(self)
+        :return: None
+        """
+        if not 0 <= index <= len(self.moves):
+            raise ValueError(f"move index {index} out of range 0..{len(self.moves)}")
+
+        nearest = self.snapshots[min(index // self.interval, len(self.snapshots) - 1)]
+        if index < self.position or nearest.index > self.position:
+            self._restore(nearest)
+        while self.position < index:
+            self.step()
+
+    def run(self) -> GameEngine:
+        """
+        Plays every remaining move
+        :return: GameEngine in the final state
+        """
+        self.seek(len(self.moves))
+        return self.engine
+
+
+if __name__ == '__main__':
+    main()
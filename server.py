@@ -0,0 +1,380 @@
+import argparse
+import asyncio
+import json
+import random
+import threading
+from chunks import ChunkedField, EndlessEngine
+from engine import GameEngine, board_openings
+from minefield import Difficulty, difficulty_dict, generate_minefield
+from neighbors import neighbor_table
+from noguess import NoGuessGenerator, default_start
+
+#################
+# -- GLOBALS -- #
+#################
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Longest request line a client may send, in bytes
+MAX_LINE = 1 << 16
+
+# Pending connections queued by the listening socket
+BACKLOG = 4096
+
+# Games one connection may hold open at once
+MAX_GAMES = 64
+
+# Largest board a client may ask for
+MAX_CELLS = 256 * 256
+
+# How a tile that is not revealed is shown to clients; revealed tiles show their value
+HIDDEN = '#'
+FLAGGED = 'F'
+
+
+########################
+# --STATIC FUNCTIONS-- #
+########################
+
+
+def cell_view(engine, x, y) -> str:
+    """
+    Shows a tile the way a player sees it
+    :param engine: GameEngine
+    :param x: index of column
+    :param y: index of row
+    :return: str: its value if revealed, FLAGGED or HIDDEN otherwise
+    """
+    if engine.is_revealed(x, y):
+        return engine.value(x, y)
+    return FLAGGED if engine.is_flagged(x, y) else HIDDEN
+
+
+def board_view(engine) -> list:
+    """
+    Shows a whole board the way a player sees it
+    :param engine: GameEngine
+    :return: list: one str per row, one character per tile as from cell_view
+    """
+    return [''.join(cell_view(engine, x, y) for x in range(engine.cols)) for y in range(engine.rows)]
+
+
+def encode(message) -> bytes:
+    return (json.dumps(message, separators=(',', ':')) + "\n").encode()
+
+
+def _integer(request, key, default=None) -> int:
+    value = request.get(key, default)
+    if type(value) is not int:
+        raise ValueError(f"{key!r} must be an integer, got {value!r}")
+    return value
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, path=None, max_games=MAX_GAMES, workers=None) -> None:
+    """
+    Runs a GameServer until cancelled
+    :param host: address to listen on [optional]
+    :param port: TCP port [optional]
+    :param path: listen on this Unix socket instead of TCP [optional]
+    :param max_games: games one connection may hold open [optional]
+    :param workers: processes searching no-guess boards, None for one per CPU [optional]
+    :return: None
+    """
+    server = GameServer(max_games, workers)
+    try:
+        listener = await server.start(host, port, path)
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Host PySweeper games for bots over line-delimited JSON")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="TCP port")
+    parser.add_argument('--unix', metavar='PATH', help="listen on a Unix socket instead of TCP")
+    parser.add_argument('--max-games', type=int, default=MAX_GAMES, help="games one connection may hold open")
+    parser.add_argument('--workers', type=int, default=None, help="processes searching no-guess boards")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.max_games, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+###############
+# --CLASSES-- #
+###############
+
+
+class Session:
+    """
+    Games of one connection. Each request is a JSON object on its own line and gets exactly one
+    JSON line back, in order; moves answer with the tiles they changed rather than the whole board.
+
+    Requests, with an optional "id" echoed in the response:
+        {"cmd": "new", "difficulty": "expert"} or {"cmd": "new", "mines": m, "cols": c, "rows": r},
+            optionally with "seed", "safe": [x, y] and "no_guess": true -> "game", size and "seed"
+        {"cmd": "new", "endless": true} optionally with "seed" -> "game", "seed" and the opened start area;
+            the board has no edges, moves also answer "score" and "state" answers no "board"
+        {"cmd": "reveal" | "flag" | "chord", "game": g, "x": x, "y": y} -> "cells", "state", "mines_left"
+        {"cmd": "state", "game": g} -> "board" as from board_view, "state", "mines_left"
+        {"cmd": "close", "game": g}
+    "cells" lists [x, y, tile] for every changed tile, the tile as from cell_view.
+    Failed requests answer {"ok": false, "error": message}.
+    """
+
+    def __init__(self, server):
+        """
+        Init method of Session class
+        :param server: GameServer
+        """
+        self.server = server
+        self.games = {}
+        self._next_game = 0
+
+    async def handle(self, request) -> dict:
+        """
+        Runs one request
+        :param request: decoded JSON object
+        :return: dict: the response
+        """
+        commands = {
+            'new': self.new,
+            'reveal': self.reveal,
+            'flag': self.flag,
+            'chord': self.chord,
+            'state': self.state,
+            'close': self.close,
+        }
+        response = {'id': request['id']} if 'id' in request else {}
+        try:
+            name = request.get('cmd')
+            command = commands.get(name) if isinstance(name, str) else None
+            if command is None:
+                raise ValueError(f"unknown command {name!r}, expected one of {tuple(commands)}")
+            result = await command(request)
+        except ValueError as e:
+            response.update(ok=False, error=str(e))
+        else:
+            response.update(ok=True, **result)
+        return response
+
+    def _game(self, request) -> GameEngine:
+        game = request.get('game')
+        if type(game) is not int or game not in self.games:
+            raise ValueError(f"unknown game {game!r}")
+        return self.games[game]
+
+    @staticmethod
+    def _tile(request, engine) -> tuple:
+        x, y = _integer(request, 'x'), _integer(request, 'y')
+        if engine.cols is not None and not (0 <= x < engine.cols and 0 <= y < engine.rows):
+            raise ValueError(f"tile ({x}, {y}) is outside the {engine.cols}x{engine.rows} board")
+        return x, y
+
+    @staticmethod
+    def _moved(engine, cells) -> dict:
+        """
+        Describes the outcome of a move
+        :param engine: GameEngine the move was played on
+        :param cells: (x, y) of every tile the move changed
+        :return: dict: changed tiles, game state and mines left
+        """
+        if engine.lost:
+            # As in the window, losing shows every mine
+            cells = cells | engine.reveal_mines()
+        moved = {
+            'cells': [[x, y, cell_view(engine, x, y)] for x, y in cells],
+            'state': engine.state.name.lower(),
+            'mines_left': engine.mines_left,
+        }
+        if isinstance(engine, EndlessEngine):
+            moved['score'] = engine.score
+        return moved
+
+    def _add(self, engine) -> int:
+        game = self._next_game
+        self._next_game += 1
+        self.games[game] = engine
+        return game
+
+    async def new(self, request) -> dict:
+        if len(self.games) >= self.server.max_games:
+            raise ValueError(f"a connection may hold at most {self.server.max_games} games, close one first")
+        if request.get('endless', False):
+            return self.new_endless(request)
+
+        if 'difficulty' in request:
+            name = request['difficulty']
+            if not isinstance(name, str) or name not in difficulty_dict:
+                raise ValueError(f"unknown difficulty {name!r}, expected one of {tuple(difficulty_dict)}")
+            level = difficulty_dict[name]
+        else:
+            level = Difficulty(_integer(request, 'mines'), _integer(request, 'cols'), _integer(request, 'rows'))
+        if level.cols < 1 or level.rows < 1 or not 0 <= level.mines < level.cols * level.rows:
+            raise ValueError(f"no board of {level.cols}x{level.rows} can hold {level.mines} mines")
+        if level.cols * level.rows > MAX_CELLS:
+            raise ValueError(f"boards are limited to {MAX_CELLS} tiles")
+
+        seed = request.get('seed')
+        if seed is not None:
+            seed = _integer(request, 'seed')
+        no_guess = bool(request.get('no_guess', False))
+        safe = request.get('safe')
+        if safe is not None:
+            if not (isinstance(safe, list) and len(safe) == 2 and all(type(value) is int for value in safe)
+                    and 0 <= safe[0] < level.cols and 0 <= safe[1] < level.rows):
+                raise ValueError(f"'safe' must be [x, y] of a tile on the board, got {safe!r}")
+            safe = tuple(safe)
+
+        # Dealing can take a while on large or no-guess boards, keep serving the other connections meanwhile
+        deal = await asyncio.get_running_loop().run_in_executor(None, self.server.deal, level, seed, safe, no_guess)
+        seed, minefield, openings, start = deal
+
+        engine = GameEngine(minefield, openings=openings)
+        game = self._add(engine)
+        response = {'game': game, 'mines': level.mines, 'cols': level.cols, 'rows': level.rows, 'seed': seed}
+        if start is not None:
+            # As in the window, a no-guess game starts with its first tile open
+            response.update(self._moved(engine, engine.reveal(*start)))
+        return response
+
+    def new_endless(self, request) -> dict:
+        seed = request.get('seed')
+        seed = random.randrange(2 ** 63) if seed is None else _integer(request, 'seed')
+        field = ChunkedField(seed)
+        engine = EndlessEngine(field)
+        response = {'game': self._add(engine), 'endless': True, 'seed': seed}
+        # The start tile is always an opening, as in a no-guess game it is opened for the player
+        response.update(self._moved(engine, engine.reveal(*field.start)))
+        return response
+
+    async def reveal(self, request) -> dict:
+        engine = self._game(request)
+        return self._moved(engine, engine.reveal(*self._tile(request, engine)))
+
+    async def flag(self, request) -> dict:
+        engine = self._game(request)
+        x, y = self._tile(request, engine)
+        return self._moved(engine, {(x, y)} if engine.toggle_flag(x, y) else set())
+
+    async def chord(self, request) -> dict:
+        engine = self._game(request)
+        return self._moved(engine, engine.chord(*self._tile(request, engine)))
+
+    async def state(self, request) -> dict:
+        engine = self._game(request)
+        if isinstance(engine, EndlessEngine):
+            return {'state': engine.state.name.lower(), 'mines_left': engine.mines_left, 'score': engine.score}
+        return {'board': board_view(engine), 'state': engine.state.name.lower(), 'mines_left': engine.mines_left}
+
+    async def close(self, request) -> dict:
+        self._game(request)
+        del self.games[request['game']]
+        return {}
+
+
+class GameServer:
+    """
+    Hosts independent games for many connections in one process, using the same rules as the window.
+    Every connection gets its own Session; requests of one connection are answered in order.
+    """
+
+    def __init__(self, max_games=MAX_GAMES, workers=None):
+        """
+        Init method of GameServer class
+        :param max_games: games one connection may hold open [optional]
+        :param workers: processes searching no-guess boards, None for one per CPU [optional]
+        """
+        if max_games < 1:
+            raise ValueError(f"max_games must be positive, got {max_games}")
+
+        self.max_games = max_games
+        self.workers = workers
+        self.sessions = set()
+        self.generator = None
+        self._lock = threading.Lock()
+
+    def deal(self, level, seed=None, safe=None, no_guess=False) -> tuple:
+        """
+        Generates the board of a new game, with its opening index and the neighbor table of its size.
+        Called from executor threads.
+        :param level: minefield.Difficulty
+        :param seed: seed of the board, random if None [optional]
+        :param safe: (x, y) kept clear of mines [optional]
+        :param no_guess: only deal a board that needs no guess from safe, the centre by default [optional]
+        :return: (seed, 2D list of string values, metrics.OpeningIndex or None, (x, y) to open or None)
+        """
+        if no_guess:
+            with self._lock:
+                if self.generator is None:
+                    self.generator = NoGuessGenerator(self.workers)
+            start = safe or default_start(level.cols, level.rows)
+            seed, minefield = self.generator.generate(level.mines, level.cols, level.rows, seed, start)
+        else:
+            start = None
+            if seed is None:
+                seed = random.randrange(2 ** 63)
+            minefield = generate_minefield(level.mines, level.cols, level.rows, seed=seed, safe=safe)
+
+        # Every game that reaches a blank tile uses both; the engine then finds the table cached
+        neighbor_table(level.rows, level.cols)
+        return seed, minefield, board_openings(minefield), start
+
+    async def _serve(self, reader, writer) -> None:
+        session = Session(self)
+        self.sessions.add(session)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The line outgrew the stream limit; the rest of the stream cannot be framed anymore
+                    writer.write(encode({'ok': False, 'error': f"requests are limited to {MAX_LINE} bytes"}))
+                    break
+                if not line:
+                    break
+
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    response = {'ok': False, 'error': f"invalid JSON: {e}"}
+                else:
+                    if isinstance(request, dict):
+                        response = await session.handle(request)
+                    else:
+                        response = {'ok': False, 'error': "a request must be a JSON object"}
+                writer.write(encode(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            # The server is shutting down; the connection just closes
+            pass
+        finally:
+            self.sessions.discard(session)
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None) -> asyncio.AbstractServer:
+        """
+        Starts listening for connections
+        :param host: address to listen on [optional]
+        :param port: TCP port, 0 for any free port [optional]
+        :param path: listen on this Unix socket instead of TCP [optional]
+        :return: asyncio server, already accepting connections
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(self._serve, path, limit=MAX_LINE, backlog=BACKLOG)
+        return await asyncio.start_server(self._serve, host, port, limit=MAX_LINE, backlog=BACKLOG)
+
+    def close(self) -> None:
+        if self.generator is not None:
+            self.generator.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+import argparse
+import json
+import random
+import sys
+import time
+from multiprocessing import Pool
+from engine import GameEngine
+from metrics import board_metrics
+from minefield import Difficulty, difficulty_dict, generate_minefield
+from solver import Solver
+
+########################
+# --STATIC FUNCTIONS-- #
+########################
+
+
+def play_solver(engine, rand) -> int:
+    """
+    Plays with the solver, guessing the safest tile when logic runs out
+    :param engine: GameEngine after the first click
+    :param rand: random.Random of the game
+    :return: int: number of moves played
+    """
+    return len(Solver(engine).auto_play(guess=True))
+
+
+def play_logic(engine, rand) -> int:
+    """
+    Plays only moves the solver can prove, giving up (a loss) at the first forced guess
+    :param engine: GameEngine after the first click
+    :param rand: random.Random of the game
+    :return: int: number of moves played
+    """
+    return len(Solver(engine).auto_play(guess=False))
+
+
+def play_random(engine, rand) -> int:
+    """
+    Reveals random hidden tiles until the game ends; a baseline for the other strategies
+    :param engine: GameEngine after the first click
+    :param rand: random.Random of the game
+    :return: int: number of moves played
+    """
+    hidden = [(x, y) for y in range(engine.rows) for x in range(engine.cols)]
+    rand.shuffle(hidden)
+    moves = 0
+    for x, y in hidden:
+        if not engine.playing:
+            break
+        if not engine.is_revealed(x, y):
+            engine.reveal(x, y)
+            moves += 1
+    return moves
+
+
+STRATEGIES = {
+    'solver': play_solver,
+    'logic': play_logic,
+    'random': play_random,
+}
+
+
+def play_game(task) -> dict:
+    """
+    Generates and plays a single headless game
+    :param task: (difficulty name, Difficulty, seed, strategy name)
+    :return: dict: per-game result
+    """
+    name, level, seed, strategy = task
+    start = time.perf_counter()
+    safe = (level.cols // 2, level.rows // 2)
+    minefield = generate_minefield(level.mines, level.cols, level.rows, seed=seed, safe=safe)
+    engine = GameEngine(minefield)
+
+    engine.reveal(*safe)
+    moves = 1 + STRATEGIES[strategy](engine, random.Random(seed))
+    # Scoring the board is bookkeeping, not play; keep it out of the duration
+    duration = time.perf_counter() - start
+
+    return {
+        'difficulty': name,
+        'seed': seed,
+        'strategy': strategy,
+        'won': engine.won,
+        'moves': moves,
+        '3bv': board_metrics(minefield).three_bv,
+        'duration': duration,
+    }
+
+
+def make_tasks(levels, games, seed, strategy):
+    """
+    Yields one task per game; game i of every level uses seed + i, so results do not depend on the worker count
+    :param levels: dict: name -> Difficulty
+    :param games: games per level
+    :param seed: first seed
+    :param strategy: strategy name
+    :return: generator of tasks
+    """
+    for name, level in levels.items():
+        for i in range(games):
+            yield name, level, seed + i, strategy
+
+
+def summarize(results, start) -> dict:
+    """
+    Merges per-game results into win-rate and throughput figures per difficulty,
+    plus a 'total' entry with the wall-clock throughput of the whole run.
+    Results are consumed one at a time, so a generator of millions of games is never held in memory.
+    :param results: iterable of per-game result dicts
+    :param start: time.perf_counter() when the run began
+    :return: dict: difficulty -> summary
+    """
+    summary = {}
+    for result in results:
+        entry = summary.setdefault(result['difficulty'], {
+            'games': 0, 'wins': 0, 'moves': 0, '3bv': 0, 'won_3bv': 0, 'duration': 0.0,
+        })
+        entry['games'] += 1
+        entry['wins'] += result['won']
+        entry['moves'] += result['moves']
+        entry['3bv'] += result['3bv']
+        entry['won_3bv'] += result['3bv'] if result['won'] else 0
+        entry['duration'] += result['duration']
+
+    elapsed = time.perf_counter() - start
+    for entry in summary.values():
+        games = entry['games']
+        duration = entry.pop('duration')
+        entry['win_rate'] = entry['wins'] / games
+        entry['mean_moves'] = entry.pop('moves') / games
+        entry['mean_3bv'] = entry.pop('3bv') / games
+        entry['mean_won_3bv'] = entry.pop('won_3bv') / entry['wins'] if entry['wins'] else 0.0
+        entry['mean_duration'] = duration / games
+        entry['games_per_cpu_second'] = games / duration if duration else 0.0
+
+    games = sum(entry['games'] for entry in summary.values())
+    wins = sum(entry['wins'] for entry in summary.values())
+    summary['total'] = {
+        'games': games,
+        'wins': wins,
+        'win_rate': wins / games if games else 0.0,
+        'elapsed': elapsed,
+        'games_per_second': games / elapsed if elapsed else 0.0,
+    }
+    return summary
+
+
+def run(levels, games, seed=0, strategy='solver', workers=None, stream=None) -> dict:
+    """
+    Plays games for every level across a process pool
+    :param levels: dict: name -> Difficulty
+    :param games: games per level
+    :param seed: first seed [optional]
+    :param strategy: key of STRATEGIES [optional]
+    :param workers: number of processes, None for one per CPU, 1 to run in this process [optional]
+    :param stream: file object receiving one JSON line per game as it finishes [optional]
+    :return: dict: summary from summarize()
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"unknown strategy {strategy!r}, expected one of {tuple(STRATEGIES)}")
+
+    tasks = make_tasks(levels, games, seed, strategy)
+    start = time.perf_counter()
+
+    def collect(iterator):
+        for result in iterator:
+            if stream is not None:
+                stream.write(json.dumps(result) + "\n")
+            yield result
+
+    if workers == 1:
+        return summarize(collect(map(play_game, tasks)), start)
+    with Pool(workers) as pool:
+        return summarize(collect(pool.imap_unordered(play_game, tasks, chunksize=64)), start)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Play headless PySweeper games in bulk and report statistics")
+    parser.add_argument('--games', type=int, default=1000, help="games per difficulty")
+    parser.add_argument('--difficulty', nargs='+', choices=tuple(difficulty_dict), default=['beginner'])
+    parser.add_argument('--custom', nargs=3, type=int, metavar=('MINES', 'COLS', 'ROWS'),
+                        help="play a custom size instead of the named difficulties")
+    parser.add_argument('--strategy', choices=tuple(STRATEGIES), default='solver')
+    parser.add_argument('--workers', type=int, default=None, help="processes, default one per CPU")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game")
+    parser.add_argument('--results', help="write one JSON line per game to this file, '-' for stdout")
+    args = parser.parse_args(argv)
+
+    if args.custom:
+        levels = {'custom': Difficulty(*args.custom)}
+    else:
+        levels = {name: difficulty_dict[name] for name in args.difficulty}
+
+    stream = None
+    if args.results == '-':
+        stream = sys.stdout
+    elif args.results:
+        stream = open(args.results, 'w')
+
+    try:
+        summary = run(levels, args.games, args.seed, args.strategy, args.workers, stream)
+    finally:
+        if stream not in (None, sys.stdout):
+            stream.close()
+
+    out = sys.stderr if stream is sys.stdout else sys.stdout
+    out.write(json.dumps(summary, indent=2) + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,394 @@
+from collections import namedtuple
+from math import comb
+
+#################
+# -- GLOBALS -- #
+#################
+
+Hint = namedtuple("Hint", "x y action probability")
+
+# Frontier components with more unknown tiles than this are estimated instead of enumerated
+MAX_ENUMERATION = 40
+
+
+###############
+# --CLASSES-- #
+###############
+
+
+class Solver:
+    """
+    Constraint-propagation solver working on the state of a GameEngine.
+    Every revealed number is a constraint on its hidden neighbors. Constraints are only re-examined
+    when a move changes the tiles around them, so the work per move is proportional to the frontier
+    that changed. Flags are trusted as mines.
+    """
+
+    def __init__(self, engine):
+        """
+        Init method of Solver class
+        :param engine: GameEngine to solve, must have a fixed size and mine count
+        """
+        self.engine = engine
+        self.safe = set()
+        self.mines = set()
+        self.constraints = {}
+        self.dirty = set()
+        self._mark_changed({
+            (x, y) for y in range(engine.rows) for x in range(engine.cols)
+            if engine.is_revealed(x, y) or engine.is_flagged(x, y)
+        })
+        engine.add_listener(self._mark_changed)
+
+    def _mark_changed(self, cells) -> None:
+        """
+        Marks the constraints touched by changed tiles for re-examination
+        :param cells: (x, y) of the tiles changed by a move
+        :return: None
+        """
+        engine = self.engine
+        for cell in cells:
+            if engine.is_revealed(*cell):
+                self.safe.discard(cell)
+                self.dirty.add(cell)
+            for adj in engine.adjacent(*cell):
+                if engine.is_revealed(*adj):
+                    self.dirty.add(adj)
+
+    def _is_known_mine(self, cell) -> bool:
+        return cell in self.mines or self.engine.is_flagged(*cell)
+
+    def _constraint(self, cell):
+        """
+        Builds the constraint of a revealed number
+        :param cell: (x, y) of the number
+        :return: (frozenset of unknown (x, y), mines among them) or None if nothing is unknown
+        """
+        engine = self.engine
+        value = engine.value(*cell)
+        if value in ('0', 'X'):
+            return None
+
+        need = int(value)
+        unknown = []
+        for adj in engine.adjacent(*cell):
+            if engine.is_revealed(*adj) or adj in self.safe:
+                continue
+            if self._is_known_mine(adj):
+                need -= 1
+            else:
+                unknown.append(adj)
+        if not unknown:
+            return None
+        return frozenset(unknown), need
+
+    def _learn(self, cells, mine) -> None:
+        """
+        Records deduced safe tiles or mines and marks the numbers around them dirty
+        :param cells: (x, y) of the deduced tiles
+        :param mine: True if the tiles are mines
+        :return: None
+        """
+        known = self.mines if mine else self.safe
+        for cell in cells:
+            if cell in known:
+                continue
+            known.add(cell)
+            for adj in self.engine.adjacent(*cell):
+                if adj in self.constraints:
+                    self.dirty.add(adj)
+
+    def _overlapping(self, cell, unknown) -> set:
+        """
+        Returns the numbers whose constraints share unknown tiles with a constraint
+        :param cell: (x, y) of the number
+        :param unknown: unknown tiles of its constraint
+        :return: set of (x, y)
+        """
+        others = set()
+        for tile in unknown:
+            for adj in self.engine.adjacent(*tile):
+                if adj != cell and adj in self.constraints:
+                    others.add(adj)
+        return others
+
+    def propagate(self) -> None:
+        """
+        Applies the single-cell and subset rules to every dirty constraint until nothing new is learned
+        :return: None
+        """
+        while self.dirty:
+            cell = self.dirty.pop()
+            constraint = self._constraint(cell)
+            if constraint is None:
+                self.constraints.pop(cell, None)
+                continue
+            self.constraints[cell] = constraint
+
+            unknown, need = constraint
+            if need == 0:
+                self._learn(unknown, mine=False)
+                continue
+            if need == len(unknown):
+                self._learn(unknown, mine=True)
+                continue
+
+            for other in self._overlapping(cell, unknown):
+                other_unknown, other_need = self.constraints[other]
+                if unknown < other_unknown:
+                    rest, rest_need = other_unknown - unknown, other_need - need
+                elif other_unknown < unknown:
+                    rest, rest_need = unknown - other_unknown, need - other_need
+                else:
+                    continue
+
+                if rest_need == 0:
+                    self._learn(rest, mine=False)
+                elif rest_need == len(rest):
+                    self._learn(rest, mine=True)
+
+    def _components(self) -> list:
+        """
+        Splits the frontier constraints into groups that share no unknown tiles
+        :return: list of lists of (frozenset unknown, need)
+        """
+        constraints = list(self.constraints.values())
+        parent = list(range(len(constraints)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        owner = {}
+        for i, (unknown, _) in enumerate(constraints):
+            for tile in unknown:
+                if tile in owner:
+                    parent[find(i)] = find(owner[tile])
+                else:
+                    owner[tile] = i
+
+        groups = {}
+        for i, constraint in enumerate(constraints):
+            groups.setdefault(find(i), []).append(constraint)
+        return list(groups.values())
+
+    @staticmethod
+    def _enumerate(constraints) -> tuple:
+        """
+        Counts every mine assignment of a frontier component that satisfies all of its constraints
+        :param constraints: list of (frozenset unknown, need)
+        :return: (tiles, {mines: solutions}, {mines: [solutions with a mine per tile]})
+        """
+        # Order tiles constraint by constraint so constraints close early and prune the search
+        tiles = []
+        seen = set()
+        for unknown, _ in constraints:
+            for tile in sorted(unknown):
+                if tile not in seen:
+                    seen.add(tile)
+                    tiles.append(tile)
+        index = {tile: i for i, tile in enumerate(tiles)}
+
+        need = [n for _, n in constraints]
+        left = [len(unknown) for unknown, _ in constraints]
+        tile_constraints = [[] for _ in tiles]
+        for c, (unknown, _) in enumerate(constraints):
+            for tile in unknown:
+                tile_constraints[index[tile]].append(c)
+
+        assignment = [0] * len(tiles)
+        solutions = {}
+        tile_counts = {}
+
+        def search(i, mines):
+            if i == len(tiles):
+                solutions[mines] = solutions.get(mines, 0) + 1
+                counts = tile_counts.setdefault(mines, [0] * len(tiles))
+                for t, value in enumerate(assignment):
+                    counts[t] += value
+                return
+
+            for value in (0, 1):
+                valid = True
+                for c in tile_constraints[i]:
+                    need[c] -= value
+                    left[c] -= 1
+                    if need[c] < 0 or need[c] > left[c]:
+                        valid = False
+                if valid:
+                    assignment[i] = value
+                    search(i + 1, mines + value)
+                for c in tile_constraints[i]:
+                    need[c] += value
+                    left[c] += 1
+            assignment[i] = 0
+
+        search(0, 0)
+        return tiles, solutions, tile_counts
+
+    @staticmethod
+    def _convolve(first, second) -> dict:
+        result = {}
+        for a, count_a in first.items():
+            for b, count_b in second.items():
+                result[a + b] = result.get(a + b, 0) + count_a * count_b
+        return result
+
+    def probabilities(self) -> dict:
+        """
+        Computes the exact probability of a mine on every unknown tile, weighting the frontier
+        components by the ways the remaining mines can be spread over the tiles away from the frontier
+        :return: dict: (x, y) -> probability
+        """
+        engine = self.engine
+        results = []
+        probabilities = {}
+        for component in self._components():
+            if len(set().union(*(unknown for unknown, _ in component))) <= MAX_ENUMERATION:
+                results.append(self._enumerate(component))
+                continue
+            # Too large to enumerate: estimate each tile from its tightest constraint
+            for unknown, need in component:
+                for tile in unknown:
+                    probabilities[tile] = max(probabilities.get(tile, 0.0), need / len(unknown))
+        estimated_mines = round(sum(probabilities.values()))
+
+        frontier = set(probabilities)
+        for tiles, _, _ in results:
+            frontier.update(tiles)
+
+        interior = [
+            (x, y) for y in range(engine.rows) for x in range(engine.cols)
+            if not engine.is_revealed(x, y) and (x, y) not in frontier
+            and (x, y) not in self.safe and not self._is_known_mine((x, y))
+        ]
+        unflagged_mines = sum(1 for tile in self.mines if not engine.is_flagged(*tile))
+        remaining = engine.mines - engine.flagged_count - unflagged_mines - estimated_mines
+
+        def weight(frontier_mines):
+            rest = remaining - frontier_mines
+            return comb(len(interior), rest) if 0 <= rest <= len(interior) else 0
+
+        distributions = [solutions for _, solutions, _ in results]
+        total = {0: 1}
+        for distribution in distributions:
+            total = self._convolve(total, distribution)
+        total_weight = sum(count * weight(mines) for mines, count in total.items())
+
+        for k, (tiles, _, tile_counts) in enumerate(results):
+            others = {0: 1}
+            for j, distribution in enumerate(distributions):
+                if j != k:
+                    others = self._convolve(others, distribution)
+            for t, tile in enumerate(tiles):
+                mine_weight = sum(
+                    counts[t] * count * weight(mines + other_mines)
+                    for mines, counts in tile_counts.items()
+                    for other_mines, count in others.items()
+                )
+                probabilities[tile] = mine_weight / total_weight if total_weight else 0.5
+
+        if interior:
+            interior_mines = sum(count * weight(mines) * (remaining - mines) for mines, count in total.items())
+            density = interior_mines / (total_weight * len(interior)) if total_weight else 0.5
+            for tile in interior:
+                probabilities[tile] = density
+
+        for tile in self.safe:
+            probabilities[tile] = 0.0
+        for tile in self.mines:
+            if not engine.is_flagged(*tile):
+                probabilities[tile] = 1.0
+        return probabilities
+
+    def hint(self):
+        """
+        Suggests the next move: a tile proven safe, a proven mine to flag, or the safest guess
+        :return: Hint or None when the game is over
+        """
+        engine = self.engine
+        if not engine.playing:
+            return None
+
+        self.propagate()
+        self.safe = {tile for tile in self.safe if not engine.is_revealed(*tile)}
+        for x, y in sorted(self.safe):
+            return Hint(x, y, 'reveal', 0.0)
+        for x, y in sorted(self.mines):
+            if not engine.is_flagged(x, y):
+                return Hint(x, y, 'flag', 1.0)
+
+        probabilities = self.probabilities()
+        if not probabilities:
+            return None
+        # Prefer the lowest probability, then tiles with fewer neighbors, which open up more often
+        (x, y), probability = min(
+            probabilities.items(), key=lambda item: (item[1], len(engine.adjacent(*item[0])), item[0])
+        )
+        return Hint(x, y, 'reveal', probability)
+
+    def _chordable(self, x, y):
+        """
+        Finds a revealed number next to a tile whose mines are all flagged, so that
+        chording it opens the tile together with its other hidden neighbors
+        :param x: index of column
+        :param y: index of row
+        :return: (x, y) of the number or None
+        """
+        engine = self.engine
+        for adj in engine.adjacent(x, y):
+            value = engine.value(*adj)
+            if engine.is_revealed(*adj) and value not in ('0', 'X') and engine.flagged_adjacent(*adj) == int(value):
+                return adj
+        return None
+
+    def plan(self, guess=False):
+        """
+        Turns hint() into a move, chording a satisfied number next to a safe tile when possible
+        :param guess: allow moves that are not proven safe [optional]
+        :return: Hint with action 'reveal', 'flag' or 'chord', or None if there is no move to play
+        """
+        hint = self.hint()
+        if hint is None or (not guess and 0.0 < hint.probability < 1.0):
+            return None
+
+        if hint.action == 'reveal' and hint.probability == 0.0:
+            number = self._chordable(hint.x, hint.y)
+            if number is not None:
+                return Hint(*number, 'chord', 0.0)
+        return hint
+
+    def step(self, guess=False):
+        """
+        Plays the move suggested by plan()
+        :param guess: allow moves that are not proven safe [optional]
+        :return: Hint of the move played or None if no move was played
+        """
+        move = self.plan(guess)
+        if move is None:
+            return None
+
+        if move.action == 'flag':
+            self.engine.toggle_flag(move.x, move.y)
+        elif move.action == 'chord':
+            self.engine.chord(move.x, move.y)
+        else:
+            self.engine.reveal(move.x, move.y)
+        return move
+
+    def auto_play(self, guess=False, max_moves=None) -> list:
+        """
+        Plays moves until the game ends, no move is proven safe (unless guessing), or max_moves is reached
+        :param guess: keep playing the safest guess when logic runs out [optional]
+        :param max_moves: upper bound on the number of moves [optional]
+        :return: list: Hint of every move played
+        """
+        moves = []
+        while max_moves is None or len(moves) < max_moves:
+            move = self.step(guess)
+            if move is None:
+                break
+            moves.append(move)
+        return moves
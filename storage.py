@@ -0,0 +1,292 @@
+import numpy as np
+from engine import RegionCounts
+from minefield import MINE, count_adjacent, minefield_to_array, array_to_minefield, place_mines
+
+#################
+# -- GLOBALS -- #
+#################
+
+DIGITS = tuple(str(n) for n in range(9))
+
+
+###############
+# --CLASSES-- #
+###############
+
+
+class BitArray:
+    """
+    Fixed-size array of bits packed 8 to a byte in a bytearray
+    """
+    __slots__ = ('size', 'data')
+
+    def __init__(self, size, data=None):
+        """
+        Init method of BitArray class
+        :param size: number of bits
+        :param data: packed little-endian bytes to start from [optional]
+        """
+        self.size = size
+        self.data = bytearray((size + 7) // 8) if data is None else bytearray(data)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index) -> bool:
+        return bool(self.data[index >> 3] >> (index & 7) & 1)
+
+    def __setitem__(self, index, value) -> None:
+        if value:
+            self.data[index >> 3] |= 1 << (index & 7)
+        else:
+            self.data[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    def count(self, start=0, stop=None) -> int:
+        """
+        Counts the set bits in [start, stop)
+        :param start: first bit [optional]
+        :param stop: bit past the last one [optional]
+        :return: int
+        """
+        stop = self.size if stop is None else stop
+        if start >= stop:
+            return 0
+        chunk = int.from_bytes(self.data[start >> 3:((stop - 1) >> 3) + 1], 'little')
+        chunk = (chunk >> (start & 7)) & ((1 << (stop - start)) - 1)
+        return bin(chunk).count('1')
+
+    def to_numpy(self) -> np.ndarray:
+        """
+        Unpacks the bits into a flat boolean array
+        :return: np.ndarray
+        """
+        bits = np.unpackbits(np.frombuffer(self.data, dtype=np.uint8), count=self.size, bitorder='little')
+        return bits.astype(bool)
+
+    @classmethod
+    def from_numpy(cls, mask):
+        """
+        Packs a boolean array into a BitArray
+        :param mask: boolean array of any shape, read in C order
+        :return: BitArray
+        """
+        flat = np.asarray(mask, dtype=bool).ravel()
+        return cls(flat.size, np.packbits(flat, bitorder='little').tobytes())
+
+
+class PackedBoard:
+    """
+    Compact board storage for huge custom boards.
+    Mine, revealed and flagged states take one bit per tile and adjacency numbers take 4 bits,
+    so a tile costs 7 bits instead of a string and a Tile object.
+    Implements the StateTracker interface, so GameEngine(storage=PackedBoard(...)) runs on it directly.
+    """
+
+    def __init__(self, cols, rows, mine_bits, numbers):
+        """
+        Init method of PackedBoard class
+        :param cols: number of cols
+        :param rows: number of rows
+        :param mine_bits: BitArray with one bit per tile, set where a mine is placed
+        :param numbers: bytearray holding two 4-bit adjacency counts per byte, low nibble first
+        """
+        self.cols = cols
+        self.rows = rows
+        self.cells = cols * rows
+        self.mine_bits = mine_bits
+        self.numbers = numbers
+        self.revealed_bits = BitArray(self.cells)
+        self.flagged_bits = BitArray(self.cells)
+
+        self.mines = mine_bits.count()
+        self.safe = self.cells - self.mines
+        self.revealed_count = 0
+        self.revealed_safe = 0
+        self.flagged_count = 0
+
+    @classmethod
+    def from_mask(cls, mine_mask):
+        """
+        Builds a PackedBoard from a 2D boolean mine mask, computing adjacency numbers in bulk
+        :param mine_mask: 2D boolean array, True where a mine is placed
+        :return: PackedBoard
+        """
+        mine_mask = np.asarray(mine_mask, dtype=bool)
+        rows, cols = mine_mask.shape
+        counts = count_adjacent(mine_mask).astype(np.uint8).ravel()
+        if counts.size % 2:
+            counts = np.append(counts, np.uint8(0))
+        numbers = bytearray((counts[0::2] | (counts[1::2] << 4)).tobytes())
+        return cls(cols, rows, BitArray.from_numpy(mine_mask), numbers)
+
+    @classmethod
+    def from_array(cls, field):
+        """
+        Builds a PackedBoard from a dense int8 minefield
+        :param field: 2D int8 array from generate_minefield_array
+        :return: PackedBoard
+        """
+        return cls.from_mask(np.asarray(field) == MINE)
+
+    @classmethod
+    def from_minefield(cls, minefield):
+        """
+        Builds a PackedBoard from a 2D list of string values
+        :param minefield: 2D list of string values from generate_minefield
+        :return: PackedBoard
+        """
+        return cls.from_array(minefield_to_array(minefield))
+
+    @classmethod
+    def generate(cls, mines, cols, rows, seed=None, safe=None):
+        """
+        Generates a new board straight into packed form without building a string grid
+        :param mines: number of mines
+        :param cols: number of cols
+        :param rows: number of rows
+        :param seed: seed for reproducible mine placement [optional]
+        :param safe: (x, y) of a tile that must not hold or touch a mine [optional]
+        :return: PackedBoard
+        """
+        mine_mask = np.zeros(cols * rows, dtype=bool)
+        mine_mask[place_mines(mines, cols, rows, seed, safe)] = True
+        return cls.from_mask(mine_mask.reshape(rows, cols))
+
+    @property
+    def remaining_safe(self) -> int:
+        return self.safe - self.revealed_safe
+
+    @property
+    def mines_left(self) -> int:
+        return self.mines - self.flagged_count
+
+    def index(self, x, y) -> int:
+        return y * self.cols + x
+
+    def number(self, x, y) -> int:
+        """
+        Returns the number of mines on the 8 adjacent neighbors of a tile
+        :param x: index of column
+        :param y: index of row
+        :return: int
+        """
+        index = y * self.cols + x
+        return self.numbers[index >> 1] >> ((index & 1) << 2) & 0xF
+
+    def value(self, x, y) -> str:
+        if self.mine_bits[y * self.cols + x]:
+            return 'X'
+        return DIGITS[self.number(x, y)]
+
+    def is_mine(self, x, y) -> bool:
+        return self.mine_bits[y * self.cols + x]
+
+    def is_revealed(self, x, y) -> bool:
+        return self.revealed_bits[y * self.cols + x]
+
+    def is_flagged(self, x, y) -> bool:
+        return self.flagged_bits[y * self.cols + x]
+
+    def reveal(self, x, y) -> bool:
+        """
+        Marks a tile as revealed, clearing any flag on it
+        :param x: index of column
+        :param y: index of row
+        :return: bool: True if the tile was hidden before
+        """
+        index = y * self.cols + x
+        if self.revealed_bits[index]:
+            return False
+        if self.flagged_bits[index]:
+            self.set_flag(x, y, False)
+
+        self.revealed_bits[index] = True
+        self.revealed_count += 1
+        if not self.mine_bits[index]:
+            self.revealed_safe += 1
+        return True
+
+    def set_flag(self, x, y, flagged) -> bool:
+        """
+        Sets the flag on a hidden tile
+        :param x: index of column
+        :param y: index of row
+        :param flagged: new flag state
+        :return: bool: True if the flag state changed
+        """
+        index = y * self.cols + x
+        if self.revealed_bits[index] or self.flagged_bits[index] == flagged:
+            return False
+
+        self.flagged_bits[index] = flagged
+        self.flagged_count += 1 if flagged else -1
+        return True
+
+    def region_counts(self, x0, y0, x1, y1) -> RegionCounts:
+        """
+        Counts revealed, flagged and hidden tiles in the rectangle [x0, x1) x [y0, y1)
+        :param x0: first column
+        :param y0: first row
+        :param x1: column past the last one
+        :param y1: row past the last one
+        :return: RegionCounts
+        """
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.cols, x1), min(self.rows, y1)
+        if x0 >= x1 or y0 >= y1:
+            return RegionCounts(0, 0, 0, 0)
+
+        revealed = flagged = 0
+        for y in range(y0, y1):
+            start = y * self.cols
+            revealed += self.revealed_bits.count(start + x0, start + x1)
+            flagged += self.flagged_bits.count(start + x0, start + x1)
+
+        cells = (x1 - x0) * (y1 - y0)
+        return RegionCounts(cells, revealed, flagged, cells - revealed)
+
+    def mine_cells(self) -> list:
+        """
+        Returns the coordinates of every mine
+        :return: list: (x, y) tuples
+        """
+        return [(int(i) % self.cols, int(i) // self.cols) for i in np.flatnonzero(self.mine_bits.to_numpy())]
+
+    def mine_mask(self) -> np.ndarray:
+        return self.mine_bits.to_numpy().reshape(self.rows, self.cols)
+
+    def revealed_mask(self) -> np.ndarray:
+        return self.revealed_bits.to_numpy().reshape(self.rows, self.cols)
+
+    def flagged_mask(self) -> np.ndarray:
+        return self.flagged_bits.to_numpy().reshape(self.rows, self.cols)
+
+    def number_array(self) -> np.ndarray:
+        """
+        Unpacks the adjacency numbers of every tile
+        :return: np.ndarray: 2D uint8 array
+        """
+        packed = np.frombuffer(self.numbers, dtype=np.uint8)
+        counts = np.empty(packed.size * 2, dtype=np.uint8)
+        counts[0::2] = packed & 0xF
+        counts[1::2] = packed >> 4
+        return counts[:self.cells].reshape(self.rows, self.cols)
+
+    def to_array(self) -> np.ndarray:
+        """
+        Expands the board into a dense int8 minefield
+        :return: np.ndarray
+        """
+        field = self.number_array().astype(np.int8)
+        field[self.mine_mask()] = MINE
+        return field
+
+    def to_minefield(self) -> list:
+        return array_to_minefield(self.to_array())
+
+    def nbytes(self) -> int:
+        """
+        Returns the memory held by the packed arrays
+        :return: int
+        """
+        return len(self.mine_bits.data) + len(self.revealed_bits.data) + len(self.flagged_bits.data) + len(self.numbers)
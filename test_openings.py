@@ -0,0 +1,66 @@
+import random
+import unittest
+from engine import GameEngine, StateTracker
+from minefield import generate_minefield
+
+
+def flood_engine(minefield) -> GameEngine:
+    # Without a minefield list the engine has no opening index and always floods
+    return GameEngine(storage=StateTracker(minefield))
+
+
+def play(engines, moves) -> list:
+    """
+    Plays the same moves on every engine
+    :return: list: per move, the result of every engine
+    """
+    results = []
+    for action, x, y in moves:
+        results.append([getattr(engine, action)(x, y) for engine in engines])
+    return results
+
+
+def random_moves(rand, cols, rows, count) -> list:
+    # Flags are toggled often so that blanks get flagged during a flood and unflagged afterwards
+    actions = ('reveal', 'toggle_flag', 'toggle_flag', 'chord')
+    return [(rand.choice(actions), rand.randrange(cols), rand.randrange(rows)) for _ in range(count)]
+
+
+class OpeningIndexTest(unittest.TestCase):
+
+    def assertSameGame(self, indexed, flooded, moves):
+        for step, (first, second) in enumerate(play((indexed, flooded), moves)):
+            self.assertEqual(first, second, f"move {step} {moves[step]}")
+        self.assertEqual(indexed.state, flooded.state)
+        self.assertEqual(indexed.tracker.revealed, flooded.tracker.revealed)
+        self.assertEqual(indexed.tracker.flagged, flooded.tracker.flagged)
+
+    def test_unflagged_blank_behind_revealed_opening(self):
+        minefield = generate_minefield(0, 4, 2, seed=491)
+        flags = [('toggle_flag', 0, 1), ('toggle_flag', 1, 0), ('toggle_flag', 3, 1)]
+        moves = flags + [('reveal', 2, 0)] + flags + [('reveal', 3, 1)]
+        indexed = GameEngine(minefield)
+        self.assertSameGame(indexed, flood_engine(minefield), moves)
+        self.assertFalse(indexed.is_revealed(0, 1))
+
+    def test_random_games_match_flood(self):
+        for seed in range(300):
+            rand = random.Random(seed)
+            mines, cols, rows = rand.choice([(0, 4, 2), (2, 6, 5), (10, 9, 9), (40, 16, 16), (99, 30, 16)])
+            minefield = generate_minefield(mines, cols, rows, seed=seed)
+            moves = random_moves(rand, cols, rows, 200)
+            with self.subTest(seed=seed):
+                self.assertSameGame(GameEngine(minefield), flood_engine(minefield), moves)
+
+    def test_large_random_games_match_flood(self):
+        # Beyond neighbors.MAX_TABLE_CELLS the flood walks the CSR arrays instead of neighbor tuples
+        for seed in range(10):
+            rand = random.Random(seed)
+            minefield = generate_minefield(2000, 130, 130, seed=seed)
+            moves = random_moves(rand, 130, 130, 300)
+            with self.subTest(seed=seed):
+                self.assertSameGame(GameEngine(minefield), flood_engine(minefield), moves)
+
+
+if __name__ == '__main__':
+    unittest.main()
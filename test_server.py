@@ -0,0 +1,50 @@
+import asyncio
+import json
+import unittest
+from server import GameServer
+
+
+class SessionTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = GameServer(workers=1)
+        self.listener = await self.server.start('127.0.0.1', 0)
+        port = self.listener.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection('127.0.0.1', port)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.listener.close()
+        await self.listener.wait_closed()
+        self.server.close()
+
+    async def ask(self, line) -> dict:
+        self.writer.write(line.encode() + b"\n")
+        await self.writer.drain()
+        answer = await asyncio.wait_for(self.reader.readline(), 5)
+        self.assertTrue(answer, f"connection closed after {line!r}")
+        return json.loads(answer)
+
+    async def test_malformed_requests_keep_connection(self):
+        malformed = [
+            '{"cmd": []}', '{"cmd": {}}', '{"cmd": 1}', '{"cmd": null}', '{}', '[]', '"new"', 'not json',
+            '{"cmd": "new", "difficulty": []}', '{"cmd": "new", "mines": "1", "cols": 2, "rows": 2}',
+            '{"cmd": "new", "difficulty": "beginner", "safe": {"x": 0}}',
+            '{"cmd": "reveal", "game": [], "x": 0, "y": 0}', '{"cmd": "close", "game": {}}',
+        ]
+        for line in malformed:
+            with self.subTest(line=line):
+                response = await self.ask(line)
+                self.assertFalse(response['ok'])
+                self.assertIsInstance(response['error'], str)
+
+        game = await self.ask('{"cmd": "new", "difficulty": "beginner", "seed": 1, "id": [1]}')
+        self.assertTrue(game['ok'])
+        self.assertEqual(game['id'], [1])
+        response = await self.ask(json.dumps({'cmd': 'reveal', 'game': game['game'], 'x': 0, 'y': 0}))
+        self.assertTrue(response['ok'])
+
+
+if __name__ == '__main__':
+    unittest.main()